@@ -0,0 +1,465 @@
+from __future__ import division, absolute_import, print_function,\
+ unicode_literals
+
+import sys
+
+_unicode = type('')
+
+try:
+    # compiled by setup.py from _build.py
+    from ._nanomsg import ffi, lib as _lib
+    _compiled = True
+except ImportError:
+    # ABI mode, the declarations are parsed on every import
+    from cffi import FFI
+    from ._cdef import CDEF, NANOCONFIG_CDEF
+    ffi = FFI()
+    ffi.cdef(CDEF)
+    ffi.cdef(NANOCONFIG_CDEF)
+    _compiled = False
+
+
+def _dlopen(name):
+    if sys.platform in ('win32', 'cygwin'):
+        return ffi.dlopen(name)
+    elif sys.platform == 'darwin':
+        return ffi.dlopen('lib%s.dylib' % (name,))
+    return ffi.dlopen('lib%s.so' % (name,))
+
+
+if not _compiled:
+    _lib = _dlopen('nanomsg')
+
+
+# values from nn.h
+_NN_DONTWAIT = 1
+_NN_MSG = int(ffi.cast('size_t', -1))
+_UINT64_MAX = 2**64 - 1
+_SIZE_T_SIZE = ffi.sizeof('size_t')
+_INT_SIZE = ffi.sizeof('int')
+
+
+def nn_symbols():
+    "query the names and values of nanomsg symbols"
+    value = ffi.new('int *')
+    name_value_pairs = []
+    i = 0
+    while True:
+        name = _lib.nn_symbol(i, value)
+        if name == ffi.NULL:
+            break
+        i += 1
+        name_value_pairs.append((ffi.string(name).decode('ascii'), value[0]))
+    return name_value_pairs
+
+
+def nn_errno():
+    "retrieve the current errno"
+    return _lib.nn_errno()
+
+
+def nn_strerror(errnum):
+    "convert an error number into human-readable string"
+    msg = ffi.string(_lib.nn_strerror(errnum))
+    if str is bytes:
+        return msg  # py2
+    return msg.decode('utf-8', 'replace')
+
+
+def nn_socket(domain, protocol):
+    "create an SP socket"
+    return _lib.nn_socket(domain, protocol)
+
+
+def nn_close(socket):
+    "close an SP socket"
+    return _lib.nn_close(socket)
+
+
+def _address_bytes(address):
+    if isinstance(address, _unicode):
+        return address.encode('utf-8')
+    return address
+
+
+def nn_bind(socket, address):
+    "add a local endpoint to the socket"
+    return _lib.nn_bind(socket, _address_bytes(address))
+
+
+def nn_connect(socket, address):
+    "add a remote endpoint to the socket"
+    return _lib.nn_connect(socket, _address_bytes(address))
+
+
+def nn_shutdown(socket, how):
+    "remove an endpoint from a socket"
+    return _lib.nn_shutdown(socket, how)
+
+
+def _from_buffer(value, writable=False):
+    """Returns a char[] cdata pointing at the memory of an object supporting
+    the buffer protocol, nothing is copied. Unicode strings are sent as
+    utf-8.
+
+    The cdata holds a buffer export of value until it is released, use it as
+    a context manager so e.g. an mmap can be closed straight after the call
+    without waiting for the garbage collector (PyPy).
+    """
+    if isinstance(value, _unicode) and not writable:
+        value = value.encode('utf-8')
+    if writable:
+        if memoryview(value).readonly:
+            raise TypeError('Writable buffer is required')
+        return ffi.from_buffer(value, require_writable=True)
+    return ffi.from_buffer(value)
+
+
+def _message(pointer, size):
+    """Wrap a message allocated by nanomsg in a buffer, the message is freed
+    when the buffer is garbage collected"""
+    return ffi.buffer(ffi.gc(pointer, _lib.nn_freemsg), size)
+
+
+def nn_setsockopt(socket, level, option, value):
+    """set a socket option
+
+    socket - socket number
+    level - option level
+    option - option
+    value - a readable byte buffer (not a Unicode string) containing the value
+    returns - 0 on success or < 0 on error
+
+    """
+    with _from_buffer(value) as data:
+        return _lib.nn_setsockopt(socket, level, option, data, len(data))
+
+
+def nn_getsockopt_int(socket, level, option):
+    "retrieve an int socket option, returns (result, value, option length)"
+    value = ffi.new('int *')
+    length = ffi.new('size_t *', _INT_SIZE)
+    rtn = _lib.nn_getsockopt(socket, level, option, value, length)
+    return rtn, value[0], length[0]
+
+
+def nn_setsockopt_int(socket, level, option, value):
+    "set an int socket option"
+    return _lib.nn_setsockopt(socket, level, option, ffi.new('int *', value),
+                              _INT_SIZE)
+
+
+def nn_setsockopt_many(socket, options):
+    """set several socket options in one call
+
+    socket - socket number
+    options - a sequence of (level, option, value) where value is an int or a
+    readable byte buffer
+    returns - (result of the last nn_setsockopt call, number of options set),
+    setting stops at the first error
+
+    """
+    rtn = 0
+    count = 0
+    for level, option, value in options:
+        if isinstance(value, (int, type(2**64))):
+            rtn = nn_setsockopt_int(socket, level, option, value)
+        else:
+            rtn = nn_setsockopt(socket, level, option, value)
+        if rtn < 0:
+            break
+        count += 1
+    return rtn, count
+
+
+def nn_getsockopt(socket, level, option, value):
+    """retrieve a socket option
+
+    socket - socket number
+    level - option level
+    option - option
+    value - a writable byte buffer (e.g. a bytearray) which the option value
+    will be copied to
+    returns - number of bytes copied or on error nunber < 0
+
+    """
+    with _from_buffer(value, True) as data:
+        length = ffi.new('size_t *', len(data))
+        rtn = _lib.nn_getsockopt(socket, level, option, data, length)
+    return rtn, length[0]
+
+
+def nn_send(socket, msg, flags):
+    "send a message"
+    with _from_buffer(msg) as data:
+        return _lib.nn_send(socket, data, len(data), flags)
+
+
+def nn_recv(socket, *args):
+    "receive a message"
+    if len(args) == 1:
+        flags, = args
+        pointer = ffi.new('void **')
+        rtn = _lib.nn_recv(socket, pointer, _NN_MSG, flags)
+        if rtn < 0:
+            return rtn, None
+        return rtn, _message(pointer[0], rtn)
+    elif len(args) == 2:
+        msg_buf, flags = args
+        with _from_buffer(msg_buf, True) as data:
+            rtn = _lib.nn_recv(socket, data, len(data), flags)
+        return rtn, msg_buf
+
+
+def nn_allocmsg(size, type):
+    "allocate a message"
+    pointer = _lib.nn_allocmsg(size, type)
+    if pointer == ffi.NULL:
+        return None
+    return _message(pointer, size)
+
+
+def nn_poll(fds, timeout=-1):
+    """
+    nn_pollfds
+    :param fds: dict (file descriptor => pollmode)
+    :param timeout: timeout in milliseconds
+    :return:
+    """
+    poll_array = ffi.new('struct nn_pollfd[]', len(fds))
+    for item, (fd, event) in zip(poll_array, fds.items()):
+        item.fd = fd
+        item.events = event
+    res = _lib.nn_poll(poll_array, len(fds), int(timeout))
+    if res <= 0:
+        return res, {}
+    return res, dict((item.fd, item.revents) for item in poll_array)
+
+
+def nn_poll_array(fds, nfds, timeout):
+    """poll sockets described by an array of struct nn_pollfd
+
+    fds - a writable buffer holding at least nfds struct nn_pollfd entries,
+    revents is updated in place
+    nfds - number of entries to poll
+    timeout - timeout in milliseconds, -1 is infinite
+    returns - (result of nn_poll, list of (index, revents) for the entries
+    that are ready)
+
+    """
+    with _from_buffer(fds, True) as data:
+        if len(data) < nfds*ffi.sizeof('struct nn_pollfd'):
+            raise ValueError('fds is smaller than nfds entries')
+        poll_array = ffi.cast('struct nn_pollfd *', data)
+        res = _lib.nn_poll(poll_array, nfds, int(timeout))
+        if res <= 0:
+            return res, []
+        return res, [(i, poll_array[i].revents) for i in range(nfds)
+                     if poll_array[i].revents]
+
+
+def _release(exports):
+    for data in exports:
+        ffi.release(data)
+
+
+def _create_msghdr(buffers, writable):
+    """Returns (msghdr, iovec array, _from_buffer cdata), the last two must
+    be kept alive while msghdr is in use and the cdata released after"""
+    exports = []
+    try:
+        for value in buffers:
+            exports.append(_from_buffer(value, writable))
+    except:
+        _release(exports)
+        raise
+    iovecs = ffi.new('struct nn_iovec[]', len(exports))
+    for iovec, data in zip(iovecs, exports):
+        iovec.iov_base = data
+        iovec.iov_len = len(data)
+    hdr = ffi.new('struct nn_msghdr *')
+    hdr.msg_iov = iovecs
+    hdr.msg_iovlen = len(exports)
+    return hdr, iovecs, exports
+
+
+def nn_sendmsg(socket, buffers, flags, control=None):
+    """send a message gathered from several buffers
+
+    socket - socket number
+    buffers - a sequence of readable byte buffers sent as one message
+    flags - nn_send flags
+    control - optional readable byte buffer of control data (struct nn_cmsghdr
+    entries) e.g. as returned by nn_recvmsg_control
+    returns - number of bytes sent or on error number < 0
+
+    """
+    hdr, iovecs, exports = _create_msghdr(list(buffers), False)
+    try:
+        if control is not None:
+            data = _from_buffer(control)
+            exports.append(data)
+            hdr.msg_control = data
+            hdr.msg_controllen = len(data)
+        return _lib.nn_sendmsg(socket, hdr, flags)
+    finally:
+        _release(exports)
+
+
+def nn_recvmsg(socket, buffers, flags):
+    """receive a message scattered into several buffers
+
+    socket - socket number
+    buffers - a sequence of writable byte buffers filled in order
+    flags - nn_recv flags
+    returns - size of the message (which may be larger than the buffers, in
+    which case it was truncated) or on error number < 0
+
+    """
+    hdr, iovecs, exports = _create_msghdr(list(buffers), True)
+    try:
+        return _lib.nn_recvmsg(socket, hdr, flags)
+    finally:
+        _release(exports)
+
+
+def _cmsg_align(length):
+    return (length + _SIZE_T_SIZE - 1) & ~(_SIZE_T_SIZE - 1)
+
+
+def _address(pointer):
+    return int(ffi.cast('uintptr_t', pointer))
+
+
+def nn_recvmsg_control(socket, flags):
+    """receive a message together with its control data
+
+    socket - socket number
+    flags - nn_recv flags
+    returns - (size of the message or on error number < 0, message, control
+    data as bytes or None), the control data holds struct nn_cmsghdr entries
+    e.g. the SP_HDR routing header of raw sockets
+
+    """
+    pointer = ffi.new('void **')
+    control = ffi.new('void **')
+    iovec = ffi.new('struct nn_iovec *')
+    iovec.iov_base = pointer
+    iovec.iov_len = _NN_MSG
+    hdr = ffi.new('struct nn_msghdr *')
+    hdr.msg_iov = iovec
+    hdr.msg_iovlen = 1
+    hdr.msg_control = control
+    hdr.msg_controllen = _NN_MSG
+    rtn = _lib.nn_recvmsg(socket, hdr, flags)
+    if rtn < 0:
+        return rtn, None, None
+    message = _message(pointer[0], rtn)
+    if control[0] == ffi.NULL:
+        return rtn, message, None
+    try:
+        start = _address(control[0])
+        length = 0
+        cmsg = _lib.nn_cmsg_nxthdr_(hdr, ffi.NULL)
+        while cmsg != ffi.NULL:
+            length = _address(cmsg) - start + _cmsg_align(cmsg.cmsg_len)
+            cmsg = _lib.nn_cmsg_nxthdr_(hdr, cmsg)
+        data = ffi.buffer(control[0], length)[:]
+    finally:
+        _lib.nn_freemsg(control[0])
+    return rtn, message, data
+
+
+def nn_send_many(socket, messages, flags):
+    """send a batch of messages
+
+    socket - socket number
+    messages - an iterable of readable byte buffers
+    flags - flags passed to every nn_send call
+    returns - (number of messages sent, result of the last nn_send call),
+    sending stops at the first error
+
+    """
+    sent = 0
+    rtn = 0
+    for msg in messages:
+        rtn = nn_send(socket, msg, flags)
+        if rtn < 0:
+            break
+        sent += 1
+    return sent, rtn
+
+
+def nn_recv_many(socket, max_count, flags):
+    """receive a batch of messages
+
+    socket - socket number
+    max_count - maximum number of messages to receive
+    flags - flags for the first nn_recv call, the following calls add
+    NN_DONTWAIT so only already queued messages are drained
+    returns - (result of the last nn_recv call, list of messages)
+
+    """
+    if max_count < 1:
+        raise ValueError('max_count must be at least 1')
+    messages = []
+    pointer = ffi.new('void **')
+    for i in range(max_count):
+        rtn = _lib.nn_recv(socket, pointer, _NN_MSG,
+                           flags if i == 0 else flags | _NN_DONTWAIT)
+        if rtn < 0:
+            break
+        messages.append(_message(pointer[0], rtn))
+    return rtn, messages
+
+
+def nn_get_statistic(socket, statistic):
+    "retrieve a socket statistic, -1 on error"
+    value = _lib.nn_get_statistic(socket, statistic)
+    if value == _UINT64_MAX:
+        return -1
+    return value
+
+
+def nn_get_statistics(socket, statistics):
+    """retrieve several statistics of a socket in one call
+
+    socket - socket number
+    statistics - a sequence of NN_STAT_* values
+    returns - list of the statistic values, an entry is -1 on error
+
+    """
+    return [nn_get_statistic(socket, statistic) for statistic in statistics]
+
+
+def nn_device(socket1, socket2):
+    "start a device"
+    return _lib.nn_device(socket1, socket2)
+
+
+def nn_term():
+    "notify all sockets about process termination"
+    _lib.nn_term()
+
+
+if _compiled:
+    # only declared when nanoconfig was found at build time
+    _nclib = _lib if hasattr(_lib, 'nc_configure') else None
+else:
+    try:
+        _nclib = _dlopen('nanoconfig')
+    except OSError:
+        _nclib = None # No nanoconfig, sorry
+
+if _nclib is not None:
+    def nc_configure(socket, address):
+        "configure socket using nanoconfig"
+        return _nclib.nc_configure(socket, _address_bytes(address))
+
+    def nc_close(socket):
+        "close an SP socket configured with nn_configure"
+        _nclib.nc_close(socket)
+
+    def nc_term():
+        "shutdown nanoconfig worker thread"
+        _nclib.nc_term()
@@ -0,0 +1,60 @@
+"""cffi builder for _nanomsg_cffi._nanomsg, run by setup.py (cffi_modules).
+
+Compiling the declarations at build time saves parsing them on every import,
+_nanomsg_cffi falls back to ABI mode (ffi.dlopen) when the module was not
+built. To build it in place:
+
+    python _nanomsg_cffi/_build.py
+"""
+from __future__ import division, absolute_import, print_function,\
+ unicode_literals
+
+import ctypes
+import os
+import platform
+import sys
+
+from cffi import FFI
+
+_HERE = os.path.dirname(os.path.abspath(__file__))
+
+with open(os.path.join(_HERE, '_cdef.py')) as f:
+    exec(f.read())
+
+
+def _has_nanoconfig():
+    try:
+        if sys.platform in ('win32', 'cygwin'):
+            ctypes.windll.nanoconfig
+        elif sys.platform == 'darwin':
+            ctypes.cdll.LoadLibrary('libnanoconfig.dylib')
+        else:
+            ctypes.cdll.LoadLibrary('libnanoconfig.so')
+    except OSError:
+        return False
+    return True
+
+
+source = '#include <nanomsg/nn.h>\n'
+libraries = [str('nanomsg')]
+include_dirs = []
+if sys.platform in ('win32', 'cygwin'):
+    libraries.extend([str('ws2_32'), str('advapi32'), str('mswsock')])
+    if platform.architecture()[0] == '64bit':
+        include_dirs.append(r'C:\Program Files\nanomsg\include')
+    else:
+        include_dirs.append(r'C:\Program Files (x86)\nanomsg\include')
+
+ffibuilder = FFI()
+ffibuilder.cdef(CDEF)
+if _has_nanoconfig():
+    ffibuilder.cdef(NANOCONFIG_CDEF)
+    source += '#include <nanomsg/nanoconfig.h>\n'
+    libraries.append(str('nanoconfig'))
+ffibuilder.set_source(str('_nanomsg_cffi._nanomsg'), source,
+                      libraries=libraries, include_dirs=include_dirs)
+
+
+if __name__ == '__main__':
+    os.chdir(os.path.dirname(_HERE))
+    ffibuilder.compile(verbose=True)
@@ -0,0 +1,61 @@
+"""Declarations from nn.h and nanoconfig.h used by _nanomsg_cffi.
+
+Kept free of imports so _build.py can exec it without importing the package.
+"""
+
+CDEF = """
+struct nn_pollfd {
+    int fd;
+    short events;
+    short revents;
+};
+
+struct nn_iovec {
+    void *iov_base;
+    size_t iov_len;
+};
+
+struct nn_msghdr {
+    struct nn_iovec *msg_iov;
+    int msg_iovlen;
+    void *msg_control;
+    size_t msg_controllen;
+};
+
+struct nn_cmsghdr {
+    size_t cmsg_len;
+    int cmsg_level;
+    int cmsg_type;
+};
+
+int nn_errno (void);
+const char *nn_strerror (int errnum);
+const char *nn_symbol (int i, int *value);
+void nn_term (void);
+void *nn_allocmsg (size_t size, int type);
+int nn_freemsg (void *msg);
+int nn_socket (int domain, int protocol);
+int nn_close (int s);
+int nn_setsockopt (int s, int level, int option, const void *optval,
+                   size_t optvallen);
+int nn_getsockopt (int s, int level, int option, void *optval,
+                   size_t *optvallen);
+int nn_poll (struct nn_pollfd *fds, int nfds, int timeout);
+int nn_bind (int s, const char *addr);
+int nn_connect (int s, const char *addr);
+int nn_shutdown (int s, int how);
+int nn_send (int s, const void *buf, size_t len, int flags);
+int nn_recv (int s, void *buf, size_t len, int flags);
+int nn_sendmsg (int s, const struct nn_msghdr *msghdr, int flags);
+int nn_recvmsg (int s, struct nn_msghdr *msghdr, int flags);
+int nn_device (int s1, int s2);
+uint64_t nn_get_statistic (int s, int stat);
+struct nn_cmsghdr *nn_cmsg_nxthdr_ (const struct nn_msghdr *mhdr,
+                                    const struct nn_cmsghdr *cmsg);
+"""
+
+NANOCONFIG_CDEF = """
+int nc_configure (int s, const char *addr);
+void nc_close (int s);
+void nc_term (void);
+"""
@@ -275,6 +275,107 @@ _nanomsg_cpy_nn_getsockopt(PyObject *self, PyObject *args)
     return Py_BuildValue("in", nn_result, length);
 }
 
+static PyObject *
+_nanomsg_cpy_nn_getsockopt_int(PyObject *self, PyObject *args)
+{
+    int nn_result, socket, level, option, value;
+    size_t length;
+
+    if (!PyArg_ParseTuple(args, "iii", &socket, &level, &option))
+        return NULL;
+    value = 0;
+    length = sizeof(value);
+    nn_result = nn_getsockopt(socket, level, option, &value, &length);
+    return Py_BuildValue("iin", nn_result, value, length);
+}
+
+static PyObject *
+_nanomsg_cpy_nn_setsockopt_int(PyObject *self, PyObject *args)
+{
+    int socket, level, option, value;
+
+    if (!PyArg_ParseTuple(args, "iiii", &socket, &level, &option, &value))
+        return NULL;
+    return Py_BuildValue("i", nn_setsockopt(socket, level, option, &value,
+                                            sizeof(value)));
+}
+
+static const char _nanomsg_cpy_nn_setsockopt_many__doc__[] =
+"set several socket options in one call\n"
+"\n"
+"socket - socket number\n"
+"options - a sequence of (level, option, value) where value is an int or a "
+"readable byte buffer\n"
+"returns - (result of the last nn_setsockopt call, number of options set), "
+"setting stops at the first error\n\n";
+
+static PyObject *
+_nanomsg_cpy_nn_setsockopt_many(PyObject *self, PyObject *args)
+{
+    int nn_result, socket, level, option, int_value;
+    long long_value;
+    PyObject *options, *seq, *value, *encoded;
+    Py_ssize_t i, count;
+    Py_buffer buffer;
+
+    if (!PyArg_ParseTuple(args, "iO", &socket, &options))
+        return NULL;
+    seq = PySequence_Fast(options, "options must be a sequence");
+    if (seq == NULL)
+        return NULL;
+    count = PySequence_Fast_GET_SIZE(seq);
+    nn_result = 0;
+    for (i = 0; i < count; i++) {
+        if (!PyArg_ParseTuple(PySequence_Fast_GET_ITEM(seq, i), "iiO",
+                              &level, &option, &value)) {
+            Py_DECREF(seq);
+            return NULL;
+        }
+#ifndef IS_PY3K
+        if (PyInt_Check(value) || PyLong_Check(value)) {
+#else
+        if (PyLong_Check(value)) {
+#endif
+            long_value = PyLong_AsLong(value);
+            if (long_value == -1 && PyErr_Occurred()) {
+                Py_DECREF(seq);
+                return NULL;
+            }
+            if (long_value < INT_MIN || long_value > INT_MAX) {
+                PyErr_SetString(PyExc_OverflowError,
+                                "option value is out of range for an int");
+                Py_DECREF(seq);
+                return NULL;
+            }
+            int_value = (int)long_value;
+            nn_result = nn_setsockopt(socket, level, option, &int_value,
+                                      sizeof(int_value));
+        }
+        else {
+            if (PyUnicode_Check(value))
+                encoded = PyUnicode_AsUTF8String(value);
+            else {
+                encoded = value;
+                Py_INCREF(encoded);
+            }
+            if (encoded == NULL ||
+                    PyObject_GetBuffer(encoded, &buffer, PyBUF_SIMPLE) < 0) {
+                Py_XDECREF(encoded);
+                Py_DECREF(seq);
+                return NULL;
+            }
+            nn_result = nn_setsockopt(socket, level, option, buffer.buf,
+                                      buffer.len);
+            PyBuffer_Release(&buffer);
+            Py_DECREF(encoded);
+        }
+        if (nn_result < 0)
+            break;
+    }
+    Py_DECREF(seq);
+    return Py_BuildValue("in", nn_result, i);
+}
+
 static PyObject *
 _nanomsg_cpy_nn_bind(PyObject *self, PyObject *args)
 {
@@ -372,6 +473,356 @@ _nanomsg_cpy_nn_recv(PyObject *self, PyObject *args)
     }
 }
 
+/* Acquire a buffer for every item of seq and point an nn_iovec at each.
+   On failure no buffers are held and -1 is returned. */
+static int
+_nanomsg_cpy_fill_iovecs(PyObject *seq, struct nn_iovec *iov,
+                         Py_buffer *buffers, int flags)
+{
+    Py_ssize_t i, count;
+
+    count = PySequence_Fast_GET_SIZE(seq);
+    for (i = 0; i < count; i++) {
+        if (PyObject_GetBuffer(PySequence_Fast_GET_ITEM(seq, i), &buffers[i],
+                               flags) < 0) {
+            while (i-- > 0)
+                PyBuffer_Release(&buffers[i]);
+            return -1;
+        }
+        iov[i].iov_base = buffers[i].buf;
+        iov[i].iov_len = buffers[i].len;
+    }
+    return 0;
+}
+
+static const char _nanomsg_cpy_nn_sendmsg__doc__[] =
+"send a message gathered from several buffers\n"
+"\n"
+"socket - socket number\n"
+"buffers - a sequence of readable byte buffers sent as one message\n"
+"flags - nn_send flags\n"
+"control - optional readable byte buffer of control data (struct nn_cmsghdr "
+"entries) e.g. as returned by nn_recvmsg_control\n"
+"returns - number of bytes sent or on error number < 0\n\n";
+
+static PyObject *
+_nanomsg_cpy_nn_sendmsg(PyObject *self, PyObject *args)
+{
+    int nn_result, socket, flags;
+    PyObject *buffer_list, *seq, *control = Py_None;
+    Py_ssize_t i, count;
+    Py_buffer *buffers;
+    Py_buffer control_buffer;
+    struct nn_iovec *iov;
+    struct nn_msghdr hdr;
+
+    if (!PyArg_ParseTuple(args, "iOi|O", &socket, &buffer_list, &flags,
+                          &control))
+        return NULL;
+
+    seq = PySequence_Fast(buffer_list, "buffers must be a sequence");
+    if (seq == NULL)
+        return NULL;
+    count = PySequence_Fast_GET_SIZE(seq);
+    if (count > INT_MAX) {
+        Py_DECREF(seq);
+        PyErr_SetString(PyExc_ValueError, "too many buffers");
+        return NULL;
+    }
+    buffers = PyMem_Malloc(sizeof(Py_buffer)*(count ? count : 1));
+    iov = PyMem_Malloc(sizeof(struct nn_iovec)*(count ? count : 1));
+    if (buffers == NULL || iov == NULL) {
+        PyMem_Free(buffers);
+        PyMem_Free(iov);
+        Py_DECREF(seq);
+        return PyErr_NoMemory();
+    }
+    if (_nanomsg_cpy_fill_iovecs(seq, iov, buffers, PyBUF_SIMPLE) < 0) {
+        PyMem_Free(buffers);
+        PyMem_Free(iov);
+        Py_DECREF(seq);
+        return NULL;
+    }
+
+    memset(&hdr, 0, sizeof(hdr));
+    hdr.msg_iov = iov;
+    hdr.msg_iovlen = (int)count;
+    if (control != Py_None) {
+        if (PyObject_GetBuffer(control, &control_buffer, PyBUF_SIMPLE) < 0) {
+            for (i = 0; i < count; i++)
+                PyBuffer_Release(&buffers[i]);
+            PyMem_Free(buffers);
+            PyMem_Free(iov);
+            Py_DECREF(seq);
+            return NULL;
+        }
+        hdr.msg_control = control_buffer.buf;
+        hdr.msg_controllen = control_buffer.len;
+    }
+
+    CONCURRENCY_POINT_BEGIN
+    nn_result = nn_sendmsg(socket, &hdr, flags);
+    CONCURRENCY_POINT_END
+
+    if (control != Py_None)
+        PyBuffer_Release(&control_buffer);
+    for (i = 0; i < count; i++)
+        PyBuffer_Release(&buffers[i]);
+    PyMem_Free(buffers);
+    PyMem_Free(iov);
+    Py_DECREF(seq);
+    return Py_BuildValue("i", nn_result);
+}
+
+static const char _nanomsg_cpy_nn_recvmsg__doc__[] =
+"receive a message scattered into several buffers\n"
+"\n"
+"socket - socket number\n"
+"buffers - a sequence of writable byte buffers filled in order\n"
+"flags - nn_recv flags\n"
+"returns - size of the message (which may be larger than the buffers, in "
+"which case it was truncated) or on error number < 0\n\n";
+
+static PyObject *
+_nanomsg_cpy_nn_recvmsg(PyObject *self, PyObject *args)
+{
+    int nn_result, socket, flags;
+    PyObject *buffer_list, *seq;
+    Py_ssize_t i, count;
+    Py_buffer *buffers;
+    struct nn_iovec *iov;
+    struct nn_msghdr hdr;
+
+    if (!PyArg_ParseTuple(args, "iOi", &socket, &buffer_list, &flags))
+        return NULL;
+
+    seq = PySequence_Fast(buffer_list, "buffers must be a sequence");
+    if (seq == NULL)
+        return NULL;
+    count = PySequence_Fast_GET_SIZE(seq);
+    if (count > INT_MAX) {
+        Py_DECREF(seq);
+        PyErr_SetString(PyExc_ValueError, "too many buffers");
+        return NULL;
+    }
+    buffers = PyMem_Malloc(sizeof(Py_buffer)*(count ? count : 1));
+    iov = PyMem_Malloc(sizeof(struct nn_iovec)*(count ? count : 1));
+    if (buffers == NULL || iov == NULL) {
+        PyMem_Free(buffers);
+        PyMem_Free(iov);
+        Py_DECREF(seq);
+        return PyErr_NoMemory();
+    }
+    if (_nanomsg_cpy_fill_iovecs(seq, iov, buffers, PyBUF_WRITABLE) < 0) {
+        PyMem_Free(buffers);
+        PyMem_Free(iov);
+        Py_DECREF(seq);
+        return NULL;
+    }
+
+    memset(&hdr, 0, sizeof(hdr));
+    hdr.msg_iov = iov;
+    hdr.msg_iovlen = (int)count;
+
+    CONCURRENCY_POINT_BEGIN
+    nn_result = nn_recvmsg(socket, &hdr, flags);
+    CONCURRENCY_POINT_END
+
+    for (i = 0; i < count; i++)
+        PyBuffer_Release(&buffers[i]);
+    PyMem_Free(buffers);
+    PyMem_Free(iov);
+    Py_DECREF(seq);
+    return Py_BuildValue("i", nn_result);
+}
+
+static const char _nanomsg_cpy_nn_recvmsg_control__doc__[] =
+"receive a message together with its control data\n"
+"\n"
+"socket - socket number\n"
+"flags - nn_recv flags\n"
+"returns - (size of the message or on error number < 0, message, control "
+"data as bytes or None), the control data holds struct nn_cmsghdr entries "
+"e.g. the SP_HDR routing header of raw sockets\n\n";
+
+static PyObject *
+_nanomsg_cpy_nn_recvmsg_control(PyObject *self, PyObject *args)
+{
+    int nn_result, socket, flags;
+    void *control = NULL;
+    size_t control_size;
+    struct nn_iovec iov;
+    struct nn_msghdr hdr;
+    struct nn_cmsghdr *cmsg;
+    Message *message;
+    PyObject *control_bytes;
+
+    if (!PyArg_ParseTuple(args, "ii", &socket, &flags))
+        return NULL;
+    message = (Message*)PyType_GenericAlloc(&MessageType, 0);
+    if (message == NULL)
+        return NULL;
+
+    iov.iov_base = &message->msg;
+    iov.iov_len = NN_MSG;
+    memset(&hdr, 0, sizeof(hdr));
+    hdr.msg_iov = &iov;
+    hdr.msg_iovlen = 1;
+    hdr.msg_control = &control;
+    hdr.msg_controllen = NN_MSG;
+
+    CONCURRENCY_POINT_BEGIN
+    nn_result = nn_recvmsg(socket, &hdr, flags);
+    CONCURRENCY_POINT_END
+
+    if (nn_result < 0) {
+        Py_DECREF((PyObject*)message);
+        return Py_BuildValue("iss", nn_result, NULL, NULL);
+    }
+    message->size = nn_result;
+    if (control == NULL) {
+        return Py_BuildValue("iNs", nn_result, message, NULL);
+    }
+    control_size = 0;
+    for (cmsg = NN_CMSG_FIRSTHDR(&hdr); cmsg != NULL;
+            cmsg = NN_CMSG_NXTHDR(&hdr, cmsg))
+        control_size = ((char*)cmsg - (char*)control) +
+                       NN_CMSG_ALIGN_(cmsg->cmsg_len);
+    control_bytes = PyBytes_FromStringAndSize(control, control_size);
+    nn_freemsg(control);
+    if (control_bytes == NULL) {
+        Py_DECREF((PyObject*)message);
+        return NULL;
+    }
+    return Py_BuildValue("iNN", nn_result, message, control_bytes);
+}
+
+static const char _nanomsg_cpy_nn_send_many__doc__[] =
+"send a batch of messages releasing the GIL once\n"
+"\n"
+"socket - socket number\n"
+"messages - an iterable of readable byte buffers\n"
+"flags - flags passed to every nn_send call\n"
+"returns - (number of messages sent, result of the last nn_send call), "
+"sending stops at the first error\n\n";
+
+static PyObject *
+_nanomsg_cpy_nn_send_many(PyObject *self, PyObject *args)
+{
+    int nn_result, socket, flags;
+    PyObject *messages, *seq;
+    Py_ssize_t i, count, sent;
+    Py_buffer *buffers;
+
+    if (!PyArg_ParseTuple(args, "iOi", &socket, &messages, &flags))
+        return NULL;
+
+    seq = PySequence_Fast(messages, "messages must be iterable");
+    if (seq == NULL)
+        return NULL;
+    count = PySequence_Fast_GET_SIZE(seq);
+    buffers = PyMem_Malloc(sizeof(Py_buffer)*(count ? count : 1));
+    if (buffers == NULL) {
+        Py_DECREF(seq);
+        return PyErr_NoMemory();
+    }
+    for (i = 0; i < count; i++) {
+        if (PyObject_GetBuffer(PySequence_Fast_GET_ITEM(seq, i), &buffers[i],
+                               PyBUF_SIMPLE) < 0) {
+            while (i-- > 0)
+                PyBuffer_Release(&buffers[i]);
+            PyMem_Free(buffers);
+            Py_DECREF(seq);
+            return NULL;
+        }
+    }
+
+    nn_result = 0;
+    sent = 0;
+    CONCURRENCY_POINT_BEGIN
+    for (i = 0; i < count; i++) {
+        nn_result = nn_send(socket, buffers[i].buf, buffers[i].len, flags);
+        if (nn_result < 0)
+            break;
+        sent++;
+    }
+    CONCURRENCY_POINT_END
+
+    for (i = 0; i < count; i++)
+        PyBuffer_Release(&buffers[i]);
+    PyMem_Free(buffers);
+    Py_DECREF(seq);
+    return Py_BuildValue("ni", sent, nn_result);
+}
+
+static const char _nanomsg_cpy_nn_recv_many__doc__[] =
+"receive a batch of messages releasing the GIL once\n"
+"\n"
+"socket - socket number\n"
+"max_count - maximum number of messages to receive\n"
+"flags - flags for the first nn_recv call, the following calls add "
+"NN_DONTWAIT so only already queued messages are drained\n"
+"returns - (result of the last nn_recv call, list of messages)\n\n";
+
+static PyObject *
+_nanomsg_cpy_nn_recv_many(PyObject *self, PyObject *args)
+{
+    int nn_result, socket, flags;
+    Py_ssize_t i, max_count, received;
+    void **msgs;
+    size_t *sizes;
+    PyObject *result;
+    Message *message;
+
+    if (!PyArg_ParseTuple(args, "ini", &socket, &max_count, &flags))
+        return NULL;
+    if (max_count < 1) {
+        PyErr_SetString(PyExc_ValueError, "max_count must be at least 1");
+        return NULL;
+    }
+
+    msgs = PyMem_Malloc(sizeof(void*)*max_count);
+    sizes = PyMem_Malloc(sizeof(size_t)*max_count);
+    if (msgs == NULL || sizes == NULL) {
+        PyMem_Free(msgs);
+        PyMem_Free(sizes);
+        return PyErr_NoMemory();
+    }
+
+    received = 0;
+    CONCURRENCY_POINT_BEGIN
+    for (i = 0; i < max_count; i++) {
+        nn_result = nn_recv(socket, &msgs[i], NN_MSG,
+                            i == 0 ? flags : flags | NN_DONTWAIT);
+        if (nn_result < 0)
+            break;
+        sizes[i] = nn_result;
+        received++;
+    }
+    CONCURRENCY_POINT_END
+
+    result = PyList_New(received);
+    for (i = 0; i < received; i++) {
+        message = NULL;
+        if (result != NULL)
+            message = (Message*)PyType_GenericAlloc(&MessageType, 0);
+        if (message == NULL) {
+            /* free the messages that were not handed to Python */
+            Py_CLEAR(result);
+            nn_freemsg(msgs[i]);
+            continue;
+        }
+        message->msg = msgs[i];
+        message->size = sizes[i];
+        PyList_SET_ITEM(result, i, (PyObject*)message);
+    }
+    PyMem_Free(msgs);
+    PyMem_Free(sizes);
+    if (result == NULL)
+        return NULL;
+    return Py_BuildValue("iN", nn_result, result);
+}
+
 static PyObject *
 _nanomsg_cpy_nn_device(PyObject *self, PyObject *args)
 {
@@ -435,6 +886,117 @@ _nanomsg_cpy_nn_poll(PyObject *self, PyObject *args)
     return result;
 }
 
+static const char _nanomsg_cpy_nn_poll_array__doc__[] =
+"poll sockets described by an array of struct nn_pollfd\n"
+"\n"
+"fds - a writable buffer holding at least nfds struct nn_pollfd entries, "
+"revents is updated in place\n"
+"nfds - number of entries to poll\n"
+"timeout - timeout in milliseconds, -1 is infinite\n"
+"returns - (result of nn_poll, list of (index, revents) for the entries "
+"that are ready)\n\n";
+
+static PyObject *
+_nanomsg_cpy_nn_poll_array(PyObject *self, PyObject *args)
+{
+    int nfds, timeout_ms, res, i;
+    Py_buffer fds_buffer;
+    struct nn_pollfd *fds;
+    PyObject *ready, *item;
+
+    if (!PyArg_ParseTuple(args, "w*ii", &fds_buffer, &nfds, &timeout_ms))
+        return NULL;
+    if (nfds < 0 ||
+            (size_t)fds_buffer.len < sizeof(struct nn_pollfd)*(size_t)nfds) {
+        PyBuffer_Release(&fds_buffer);
+        PyErr_SetString(PyExc_ValueError,
+                        "fds is too small for nfds struct nn_pollfd entries");
+        return NULL;
+    }
+    fds = (struct nn_pollfd*)fds_buffer.buf;
+
+    CONCURRENCY_POINT_BEGIN
+    res = nn_poll(fds, nfds, timeout_ms);
+    CONCURRENCY_POINT_END
+
+    ready = PyList_New(0);
+    if (ready != NULL && res > 0) {
+        for (i = 0; i < nfds; i++) {
+            if (fds[i].revents == 0)
+                continue;
+            item = Py_BuildValue("ii", i, (int)fds[i].revents);
+            if (item == NULL || PyList_Append(ready, item) < 0) {
+                Py_XDECREF(item);
+                Py_CLEAR(ready);
+                break;
+            }
+            Py_DECREF(item);
+        }
+    }
+    PyBuffer_Release(&fds_buffer);
+    if (ready == NULL)
+        return NULL;
+    return Py_BuildValue("iN", res, ready);
+}
+
+static PyObject *
+_nanomsg_cpy_nn_get_statistic(PyObject *self, PyObject *args)
+{
+    int socket, statistic;
+    uint64_t value;
+
+    if (!PyArg_ParseTuple(args, "ii", &socket, &statistic))
+        return NULL;
+    value = nn_get_statistic(socket, statistic);
+    if (value == (uint64_t)-1)
+        return Py_BuildValue("i", -1);
+    return PyLong_FromUnsignedLongLong(value);
+}
+
+static const char _nanomsg_cpy_nn_get_statistics__doc__[] =
+"retrieve several statistics of a socket in one call\n"
+"\n"
+"socket - socket number\n"
+"statistics - a sequence of NN_STAT_* values\n"
+"returns - list of the statistic values, an entry is -1 on error\n\n";
+
+static PyObject *
+_nanomsg_cpy_nn_get_statistics(PyObject *self, PyObject *args)
+{
+    int socket;
+    PyObject *statistics, *seq, *result, *item;
+    Py_ssize_t i, count;
+    long statistic;
+    uint64_t value;
+
+    if (!PyArg_ParseTuple(args, "iO", &socket, &statistics))
+        return NULL;
+    seq = PySequence_Fast(statistics, "statistics must be a sequence");
+    if (seq == NULL)
+        return NULL;
+    count = PySequence_Fast_GET_SIZE(seq);
+    result = PyList_New(count);
+    for (i = 0; result != NULL && i < count; i++) {
+        statistic = PyLong_AsLong(PySequence_Fast_GET_ITEM(seq, i));
+        if (statistic == -1 && PyErr_Occurred()) {
+            Py_CLEAR(result);
+            break;
+        }
+        value = nn_get_statistic(socket, (int)statistic);
+        if (value == (uint64_t)-1)
+            item = PyLong_FromLong(-1);
+        else
+            item = PyLong_FromUnsignedLongLong(value);
+        if (item == NULL) {
+            Py_CLEAR(result);
+            break;
+        }
+        PyList_SET_ITEM(result, i, item);
+    }
+    Py_DECREF(seq);
+    return result;
+}
+
 static PyObject *
 _nanomsg_cpy_nn_term(PyObject *self, PyObject *args)
 {
@@ -508,13 +1070,24 @@ static PyMethodDef module_methods[] = {
     {"nn_close", _nanomsg_cpy_nn_close, METH_VARARGS, "close an SP socket"},
     {"nn_setsockopt", _nanomsg_cpy_nn_setsockopt, METH_VARARGS, _nanomsg_cpy_nn_setsockopt__doc__},
     {"nn_getsockopt", _nanomsg_cpy_nn_getsockopt, METH_VARARGS, _nanomsg_cpy_nn_getsockopt__doc__},
+    {"nn_getsockopt_int", _nanomsg_cpy_nn_getsockopt_int, METH_VARARGS, "retrieve an int socket option, returns (result, value, option length)"},
+    {"nn_setsockopt_int", _nanomsg_cpy_nn_setsockopt_int, METH_VARARGS, "set an int socket option"},
+    {"nn_setsockopt_many", _nanomsg_cpy_nn_setsockopt_many, METH_VARARGS, _nanomsg_cpy_nn_setsockopt_many__doc__},
     {"nn_bind", _nanomsg_cpy_nn_bind, METH_VARARGS, "add a local endpoint to the socket"},
     {"nn_connect", _nanomsg_cpy_nn_connect, METH_VARARGS, "add a remote endpoint to the socket"},
     {"nn_shutdown", _nanomsg_cpy_nn_shutdown, METH_VARARGS, "remove an endpoint from a socket"},
     {"nn_send", _nanomsg_cpy_nn_send, METH_VARARGS, "send a message"},
     {"nn_recv", _nanomsg_cpy_nn_recv, METH_VARARGS, "receive a message"},
+    {"nn_sendmsg", _nanomsg_cpy_nn_sendmsg, METH_VARARGS, _nanomsg_cpy_nn_sendmsg__doc__},
+    {"nn_recvmsg", _nanomsg_cpy_nn_recvmsg, METH_VARARGS, _nanomsg_cpy_nn_recvmsg__doc__},
+    {"nn_recvmsg_control", _nanomsg_cpy_nn_recvmsg_control, METH_VARARGS, _nanomsg_cpy_nn_recvmsg_control__doc__},
+    {"nn_send_many", _nanomsg_cpy_nn_send_many, METH_VARARGS, _nanomsg_cpy_nn_send_many__doc__},
+    {"nn_recv_many", _nanomsg_cpy_nn_recv_many, METH_VARARGS, _nanomsg_cpy_nn_recv_many__doc__},
     {"nn_device", _nanomsg_cpy_nn_device, METH_VARARGS, "start a device"},
     {"nn_poll", _nanomsg_cpy_nn_poll, METH_VARARGS, "poll sockets"},
+    {"nn_poll_array", _nanomsg_cpy_nn_poll_array, METH_VARARGS, _nanomsg_cpy_nn_poll_array__doc__},
+    {"nn_get_statistic", _nanomsg_cpy_nn_get_statistic, METH_VARARGS, "retrieve a socket statistic, -1 on error"},
+    {"nn_get_statistics", _nanomsg_cpy_nn_get_statistics, METH_VARARGS, _nanomsg_cpy_nn_get_statistics__doc__},
     {"nn_term", _nanomsg_cpy_nn_term, METH_VARARGS, "notify all sockets about process termination"},
     {"nn_allocmsg", _nanomsg_cpy_nn_allocmsg, METH_VARARGS, "allocate a message"},
     {"nn_symbols", _nanomsg_cpy_nn_symbols, METH_VARARGS, "query the names and values of nanomsg symbols"},
@@ -2,9 +2,15 @@ from __future__ import division, absolute_import, print_function,\
  unicode_literals
 
 import ctypes
-import platform
 import sys
 
+try:
+    buffer
+except NameError:
+    buffer = memoryview  # py3
+
+_unicode = type('')
+
 if sys.platform in ('win32', 'cygwin'):
     _functype = ctypes.WINFUNCTYPE
     _lib = ctypes.windll.nanomsg
@@ -16,83 +22,46 @@ else:
     _lib = ctypes.cdll.LoadLibrary('libnanomsg.so')
 
 
-def _c_func_wrapper_factory(cdecl_text):
-    def move_pointer_and_strip(type_def, name):
-        if '*' in name:
-            type_def += ' ' + name[:name.rindex('*')+1]
-            name = name.rsplit('*', 1)[1]
-        return type_def.strip(), name.strip()
-
-    def type_lookup(type_def):
-        types = {
-            'void': None,
-            'char *': ctypes.c_char_p,
-            'const char *': ctypes.c_char_p,
-            'int': ctypes.c_int,
-            'int *': ctypes.POINTER(ctypes.c_int),
-            'void *': ctypes.c_void_p,
-            'size_t':  ctypes.c_size_t,
-            'size_t *':  ctypes.POINTER(ctypes.c_size_t),
-            'struct nn_msghdr *': ctypes.c_void_p,
-            'struct nn_pollfd *': ctypes.c_void_p,
-        }
-        type_def_without_const = type_def.replace('const ','')
-        if type_def_without_const in types:
-            return types[type_def_without_const]
-        elif (type_def_without_const.endswith('*') and
-                type_def_without_const[:-1] in types):
-            return ctypes.POINTER(types[type_def_without_const[:-1]])
-        else:
-            raise KeyError(type_def)
-
-        return types[type_def.replace('const ','')]
-
-    a, b = [i.strip() for i in cdecl_text.split('(',1)]
-    params, _ = b.rsplit(')',1)
-    rtn_type, name = move_pointer_and_strip(*a.rsplit(' ', 1))
-    param_spec = []
-    for param in params.split(','):
-        if param != 'void':
-            param_spec.append(move_pointer_and_strip(*param.rsplit(' ', 1)))
-    func = _functype(type_lookup(rtn_type),
-                     *[type_lookup(type_def) for type_def, _ in param_spec])(
-                        (name, _lib),
-                        tuple((2 if '**' in type_def else 1, name)
-                              for type_def, name in param_spec)
-                    )
-    func.__name__ = name
-    return func
-
-
-_C_HEADER = """
-NN_EXPORT int nn_errno (void);
-NN_EXPORT const char *nn_strerror (int errnum);
-NN_EXPORT const char *nn_symbol (int i, int *value);
-NN_EXPORT void nn_term (void);
-NN_EXPORT void *nn_allocmsg (size_t size, int type);
-NN_EXPORT int nn_freemsg (void *msg);
-NN_EXPORT int nn_socket (int domain, int protocol);
-NN_EXPORT int nn_close (int s);
-NN_EXPORT int nn_setsockopt (int s, int level, int option, const void \
-*optval, size_t optvallen);
-NN_EXPORT int nn_getsockopt (int s, int level, int option, void *optval, \
-size_t *optvallen);
-NN_EXPORT int nn_poll(struct nn_pollfd *fds, int nfds, int timeout);
-NN_EXPORT int nn_bind (int s, const char *addr);
-NN_EXPORT int nn_connect (int s, const char *addr);
-NN_EXPORT int nn_shutdown (int s, int how);
-NN_EXPORT int nn_send (int s, const void *buf, size_t len, int flags);
-NN_EXPORT int nn_recv (int s, void *buf, size_t len, int flags);
-NN_EXPORT int nn_sendmsg (int s, const struct nn_msghdr *msghdr, int flags);
-NN_EXPORT int nn_recvmsg (int s, struct nn_msghdr *msghdr, int flags);
-NN_EXPORT int nn_device (int s1, int s2);\
-""".replace('NN_EXPORT', '')
-
-
-for cdecl_text in _C_HEADER.splitlines():
-    if cdecl_text.strip():
-        func = _c_func_wrapper_factory(cdecl_text)
-        globals()['_' + func.__name__] = func
+_int_p = ctypes.POINTER(ctypes.c_int)
+_size_t_p = ctypes.POINTER(ctypes.c_size_t)
+
+# (name, result type, argument types) of the nanomsg functions used, from nn.h
+# e.g. "int nn_send (int s, const void *buf, size_t len, int flags);". Struct
+# pointers are passed as void pointers.
+_PROTOTYPES = (
+    ('nn_errno', ctypes.c_int, ()),
+    ('nn_strerror', ctypes.c_char_p, (ctypes.c_int,)),
+    ('nn_symbol', ctypes.c_char_p, (ctypes.c_int, _int_p)),
+    ('nn_term', None, ()),
+    ('nn_allocmsg', ctypes.c_void_p, (ctypes.c_size_t, ctypes.c_int)),
+    ('nn_freemsg', ctypes.c_int, (ctypes.c_void_p,)),
+    ('nn_socket', ctypes.c_int, (ctypes.c_int, ctypes.c_int)),
+    ('nn_close', ctypes.c_int, (ctypes.c_int,)),
+    ('nn_setsockopt', ctypes.c_int, (ctypes.c_int, ctypes.c_int, ctypes.c_int,
+                                     ctypes.c_void_p, ctypes.c_size_t)),
+    ('nn_getsockopt', ctypes.c_int, (ctypes.c_int, ctypes.c_int, ctypes.c_int,
+                                     ctypes.c_void_p, _size_t_p)),
+    ('nn_poll', ctypes.c_int, (ctypes.c_void_p, ctypes.c_int, ctypes.c_int)),
+    ('nn_bind', ctypes.c_int, (ctypes.c_int, ctypes.c_char_p)),
+    ('nn_connect', ctypes.c_int, (ctypes.c_int, ctypes.c_char_p)),
+    ('nn_shutdown', ctypes.c_int, (ctypes.c_int, ctypes.c_int)),
+    ('nn_send', ctypes.c_int, (ctypes.c_int, ctypes.c_void_p, ctypes.c_size_t,
+                               ctypes.c_int)),
+    ('nn_recv', ctypes.c_int, (ctypes.c_int, ctypes.c_void_p, ctypes.c_size_t,
+                               ctypes.c_int)),
+    ('nn_sendmsg', ctypes.c_int, (ctypes.c_int, ctypes.c_void_p, ctypes.c_int)),
+    ('nn_recvmsg', ctypes.c_int, (ctypes.c_int, ctypes.c_void_p, ctypes.c_int)),
+    ('nn_device', ctypes.c_int, (ctypes.c_int, ctypes.c_int)),
+    ('nn_get_statistic', ctypes.c_uint64, (ctypes.c_int, ctypes.c_int)),
+    ('nn_cmsg_nxthdr_', ctypes.c_void_p, (ctypes.c_void_p, ctypes.c_void_p)),
+)
+
+
+for _name, _restype, _argtypes in _PROTOTYPES:
+    _func = _functype(_restype, *_argtypes)((_name, _lib))
+    _func.__name__ = str(_name)
+    globals()['_' + _name] = _func
+del _name, _restype, _argtypes, _func
 
 
 def nn_symbols():
@@ -109,6 +78,12 @@ def nn_symbols():
     return name_value_pairs
 
 
+# values from nn.h
+_NN_DONTWAIT = 1
+_UINT64_MAX = 2**64 - 1
+_NN_MSG = ctypes.c_size_t(-1).value
+
+
 nn_errno = _nn_errno
 nn_errno.__doc__ = "retrieve the current errno"
 
@@ -139,6 +114,34 @@ def create_writable_buffer(size):
     return (ctypes.c_ubyte*size)()
 
 
+def _buffer_address(value, writable=False):
+    """Returns (address, length, owner) for an object supporting the buffer
+    protocol, owner must be kept alive while the address is in use.
+
+    Only read-only buffers that are not bytes are copied.
+    """
+    try:
+        return ctypes.addressof(value), ctypes.sizeof(value), value
+    except TypeError:
+        pass
+    if isinstance(value, _unicode) and not writable:
+        value = value.encode('utf-8')
+    if isinstance(value, bytes) and not writable:
+        address = ctypes.cast(ctypes.c_char_p(value), ctypes.c_void_p).value
+        return address, len(value), value
+    view = memoryview(value)
+    length = view.itemsize
+    for dim in view.shape:
+        length *= dim
+    if view.readonly:
+        if writable:
+            raise TypeError('Writable buffer is required')
+        owner = ctypes.create_string_buffer(view.tobytes(), length)
+    else:
+        owner = (ctypes.c_char*length).from_buffer(view)
+    return ctypes.addressof(owner), length, owner
+
+
 def nn_setsockopt(socket, level, option, value):
     """set a socket option
 
@@ -149,13 +152,52 @@ def nn_setsockopt(socket, level, option, value):
     returns - 0 on success or < 0 on error
 
     """
-    try:
-        return _nn_setsockopt(socket, level, option, ctypes.addressof(value),
-                              len(value))
-    except (TypeError, AttributeError):
-        buf_value = ctypes.create_string_buffer(value)
-        return _nn_setsockopt(socket, level, option,
-                              ctypes.addressof(buf_value), len(value))
+    address, length, owner = _buffer_address(value)
+    return _nn_setsockopt(socket, level, option, address, length)
+
+
+def nn_getsockopt_int(socket, level, option):
+    "retrieve an int socket option, returns (result, value, option length)"
+    value = ctypes.c_int()
+    length = ctypes.c_size_t(ctypes.sizeof(value))
+    rtn = _nn_getsockopt(socket, level, option, ctypes.byref(value),
+                         ctypes.byref(length))
+    return rtn, value.value, length.value
+
+
+_INT_MAX = 2**(8*ctypes.sizeof(ctypes.c_int) - 1) - 1
+
+
+def nn_setsockopt_int(socket, level, option, value):
+    "set an int socket option"
+    if not -_INT_MAX - 1 <= value <= _INT_MAX:
+        raise OverflowError('option value is out of range for an int')
+    value = ctypes.c_int(value)
+    return _nn_setsockopt(socket, level, option, ctypes.byref(value),
+                          ctypes.sizeof(value))
+
+
+def nn_setsockopt_many(socket, options):
+    """set several socket options in one call
+
+    socket - socket number
+    options - a sequence of (level, option, value) where value is an int or a
+    readable byte buffer
+    returns - (result of the last nn_setsockopt call, number of options set),
+    setting stops at the first error
+
+    """
+    rtn = 0
+    count = 0
+    for level, option, value in options:
+        if isinstance(value, (int, type(2**64))):
+            rtn = nn_setsockopt_int(socket, level, option, value)
+        else:
+            rtn = nn_setsockopt(socket, level, option, value)
+        if rtn < 0:
+            break
+        count += 1
+    return rtn, count
 
 
 def nn_getsockopt(socket, level, option, value):
@@ -179,34 +221,68 @@ def nn_getsockopt(socket, level, option, value):
 
 def nn_send(socket, msg, flags):
     "send a message"
-    try:
-        return _nn_send(socket, ctypes.addressof(msg), len(buffer(msg)), flags)
-    except (TypeError, AttributeError):
-        buf_msg = ctypes.create_string_buffer(msg)
-        return _nn_send(socket, ctypes.addressof(buf_msg), len(msg), flags)
+    address, length, owner = _buffer_address(msg)
+    return _nn_send(socket, address, length, flags)
 
 
-def _create_message(address, length):
-    class Message(ctypes.Union):
-        _fields_ = [('_buf', ctypes.c_ubyte*length)]
-        _len = length
-        _address = address
+class _MessageBase(object):
+    """Methods of the Message types, _address is set per instance"""
+    _address = None
 
-        def __repr__(self):
-            return '<_nanomsg_cpy.Message size %d, address 0x%x >' % (
-                self._len,
-                self._address
-            )
+    def __repr__(self):
+        return '<_nanomsg_cpy.Message size %d, address 0x%x >' % (
+            len(self),
+            self._address or 0
+        )
 
-        def __str__(self):
-            return bytes(buffer(self))
+    def __str__(self):
+        return bytes(buffer(self))
 
-        def __del__(self):
+    def __del__(self):
+        if self._address is not None:
             _nn_freemsg(self._address)
-            self._len = 0
-            self._address = 0
+            self._address = None
+
+
+# Message types by size bucket, see _message_type
+_message_types = {}
+
+# the messages returned by nn_recv can be larger than the message, only the
+# first rtn bytes are the message
+PADDED_MESSAGES = True
+
+
+def _message_type(length):
+    """Returns the Message type for messages of up to length bytes.
+
+    Types are cached per power of two size (at least 64 bytes) so recieving
+    a message does not create a class, whatever the mix of message sizes.
+    There are fewer buckets than bits in a size_t so the cache is small.
+    """
+    size = max(64, 1 << (length - 1).bit_length())
+    message_type = _message_types.get(size)
+    if message_type is None:
+        message_type = type(str('Message'),
+                            (_MessageBase, ctypes.c_ubyte*size), {})
+        _message_types[size] = message_type
+    return message_type
 
-    return Message.from_address(address)
+
+def _create_message(address, length):
+    """Returns a Message of at least length bytes owning the nanomsg
+    allocated message at address"""
+    message = _message_type(length).from_address(address)
+    message._address = address
+    return message
+
+
+def _exact_message(address, length):
+    """As _create_message, but a memoryview of exactly length bytes is
+    returned when the Message is larger"""
+    message = _create_message(address, length)
+    if ctypes.sizeof(message) == length:
+        return message
+    return memoryview(message)[:length]
 
 
 def nn_allocmsg(size, type):
@@ -214,7 +290,7 @@ def nn_allocmsg(size, type):
     pointer = _nn_allocmsg(size, type)
     if pointer is None:
         return None
-    return _create_message(pointer, size)
+    return _exact_message(pointer, size)
 
 
 class PollFds(ctypes.Structure):
@@ -244,8 +320,31 @@ def nn_poll(fds, timeout=-1):
     return res, {item.fd: item.revents for item in poll_array}
 
 
+def nn_poll_array(fds, nfds, timeout):
+    """poll sockets described by an array of struct nn_pollfd
+
+    fds - a writable buffer holding at least nfds struct nn_pollfd entries,
+    revents is updated in place
+    nfds - number of entries to poll
+    timeout - timeout in milliseconds, -1 is infinite
+    returns - (result of nn_poll, list of (index, revents) for the entries
+    that are ready)
+
+    """
+    poll_array = (PollFds*nfds).from_buffer(fds)
+    res = _nn_poll(poll_array, nfds, int(timeout))
+    if res <= 0:
+        return res, []
+    return res, [(i, item.revents) for i, item in enumerate(poll_array)
+                 if item.revents]
+
+
 def nn_recv(socket, *args):
-    "receive a message"
+    """receive a message
+
+    Without a buffer the Message returned may be larger than the message,
+    see PADDED_MESSAGES
+    """
     if len(args) == 1:
         flags, = args
         pointer = ctypes.c_void_p()
@@ -257,13 +356,169 @@ def nn_recv(socket, *args):
             return rtn, _create_message(pointer.value, rtn)
     elif len(args) == 2:
         msg_buf, flags = args
-        mv_buf = memoryview(msg_buf)
-        if mv_buf.readonly:
-            raise TypeError('Writable buffer is required')
-        rtn = _nn_recv(socket, ctypes.addressof(msg_buf), len(mv_buf), flags)
+        address, length, owner = _buffer_address(msg_buf, True)
+        rtn = _nn_recv(socket, address, length, flags)
         return rtn, msg_buf
 
 
+class NnIovec(ctypes.Structure):
+    _fields_ = ("iov_base", ctypes.c_void_p), ("iov_len", ctypes.c_size_t)
+
+
+class NnMsghdr(ctypes.Structure):
+    _fields_ = (("msg_iov", ctypes.POINTER(NnIovec)),
+                ("msg_iovlen", ctypes.c_int),
+                ("msg_control", ctypes.c_void_p),
+                ("msg_controllen", ctypes.c_size_t))
+
+
+def _create_msghdr(buffers, writable):
+    owners = []
+    iovecs = (NnIovec*len(buffers))()
+    for iovec, value in zip(iovecs, buffers):
+        address, length, owner = _buffer_address(value, writable)
+        iovec.iov_base = address
+        iovec.iov_len = length
+        owners.append(owner)
+    hdr = NnMsghdr(iovecs, len(buffers), None, 0)
+    return hdr, owners
+
+
+def nn_sendmsg(socket, buffers, flags, control=None):
+    """send a message gathered from several buffers
+
+    socket - socket number
+    buffers - a sequence of readable byte buffers sent as one message
+    flags - nn_send flags
+    control - optional readable byte buffer of control data (struct nn_cmsghdr
+    entries) e.g. as returned by nn_recvmsg_control
+    returns - number of bytes sent or on error number < 0
+
+    """
+    hdr, owners = _create_msghdr(list(buffers), False)
+    if control is not None:
+        address, length, owner = _buffer_address(control)
+        hdr.msg_control = address
+        hdr.msg_controllen = length
+        owners.append(owner)
+    return _nn_sendmsg(socket, ctypes.addressof(hdr), flags)
+
+
+def nn_recvmsg(socket, buffers, flags):
+    """receive a message scattered into several buffers
+
+    socket - socket number
+    buffers - a sequence of writable byte buffers filled in order
+    flags - nn_recv flags
+    returns - size of the message (which may be larger than the buffers, in
+    which case it was truncated) or on error number < 0
+
+    """
+    hdr, owners = _create_msghdr(list(buffers), True)
+    return _nn_recvmsg(socket, ctypes.addressof(hdr), flags)
+
+
+def _cmsg_align(length):
+    size = ctypes.sizeof(ctypes.c_size_t)
+    return (length + size - 1) & ~(size - 1)
+
+
+def nn_recvmsg_control(socket, flags):
+    """receive a message together with its control data
+
+    socket - socket number
+    flags - nn_recv flags
+    returns - (size of the message or on error number < 0, message, control
+    data as bytes or None), the control data holds struct nn_cmsghdr entries
+    e.g. the SP_HDR routing header of raw sockets
+
+    """
+    pointer = ctypes.c_void_p()
+    control = ctypes.c_void_p()
+    iovec = NnIovec(ctypes.addressof(pointer), _NN_MSG)
+    hdr = NnMsghdr(ctypes.pointer(iovec), 1, ctypes.addressof(control),
+                   _NN_MSG)
+    rtn = _nn_recvmsg(socket, ctypes.addressof(hdr), flags)
+    if rtn < 0:
+        return rtn, None, None
+    message = _exact_message(pointer.value, rtn)
+    if not control.value:
+        return rtn, message, None
+    try:
+        length = 0
+        cmsg = _nn_cmsg_nxthdr_(ctypes.addressof(hdr), None)
+        while cmsg:
+            cmsg_len = ctypes.c_size_t.from_address(cmsg).value
+            length = cmsg - control.value + _cmsg_align(cmsg_len)
+            cmsg = _nn_cmsg_nxthdr_(ctypes.addressof(hdr), cmsg)
+        data = ctypes.string_at(control.value, length)
+    finally:
+        _nn_freemsg(control.value)
+    return rtn, message, data
+
+
+def nn_send_many(socket, messages, flags):
+    """send a batch of messages
+
+    socket - socket number
+    messages - an iterable of readable byte buffers
+    flags - flags passed to every nn_send call
+    returns - (number of messages sent, result of the last nn_send call),
+    sending stops at the first error
+
+    """
+    sent = 0
+    rtn = 0
+    for msg in messages:
+        rtn = nn_send(socket, msg, flags)
+        if rtn < 0:
+            break
+        sent += 1
+    return sent, rtn
+
+
+def nn_recv_many(socket, max_count, flags):
+    """receive a batch of messages
+
+    socket - socket number
+    max_count - maximum number of messages to receive
+    flags - flags for the first nn_recv call, the following calls add
+    NN_DONTWAIT so only already queued messages are drained
+    returns - (result of the last nn_recv call, list of messages)
+
+    """
+    if max_count < 1:
+        raise ValueError('max_count must be at least 1')
+    messages = []
+    pointer = ctypes.c_void_p()
+    for i in range(max_count):
+        rtn = _nn_recv(socket, ctypes.byref(pointer), ctypes.c_size_t(-1),
+                       flags if i == 0 else flags | _NN_DONTWAIT)
+        if rtn < 0:
+            break
+        messages.append(_exact_message(pointer.value, rtn))
+    return rtn, messages
+
+
+def nn_get_statistic(socket, statistic):
+    "retrieve a socket statistic, -1 on error"
+    value = _nn_get_statistic(socket, statistic)
+    if value == _UINT64_MAX:
+        return -1
+    return value
+
+
+def nn_get_statistics(socket, statistics):
+    """retrieve several statistics of a socket in one call
+
+    socket - socket number
+    statistics - a sequence of NN_STAT_* values
+    returns - list of the statistic values, an entry is -1 on error
+
+    """
+    return [nn_get_statistic(socket, statistic) for statistic in statistics]
+
+
 nn_device = _nn_device
 nn_device.__doc__ = "start a device"
 
@@ -2,9 +2,18 @@ from __future__ import division, absolute_import, print_function, unicode_litera
 
 from .version import __version__
 from struct import Struct as _Struct
-import warnings
+import contextlib as _contextlib
+import os as _os
+import threading as _threading
+import weakref as _weakref
 
 from . import wrapper
+from nanomsg_wrappers import get_instrumentation as _get_instrumentation
+
+try:
+    from time import perf_counter as _timer
+except ImportError:
+    from time import time as _timer  # py2
 
 try:
     buffer
@@ -13,12 +22,32 @@ except NameError:
 
 nanoconfig_started = False
 
+# (name, NN_STAT_* value) pairs reported by Socket.statistics
+_STATISTICS = []
+
+try:
+    # written by setup.py from the libnanomsg the package was built against
+    from ._symbols import SYMBOLS as _symbols
+except ImportError:
+    _symbols = wrapper.nn_symbols()
+
 #Import constants into module with NN_ prefix stripped
-for name, value in wrapper.nn_symbols():
+for name, value in _symbols:
     if name.startswith('NN_'):
         name = name[3:]
+    if name.startswith('STAT_'):
+        _STATISTICS.append((name[5:].lower(), value))
     globals()[name] = value
 
+# open sockets, used by statistics_snapshot. Several Socket objects can wrap
+# the same fd (socket_fd=) so they are not keyed by fd
+_open_sockets = _weakref.WeakSet()
+
+
+# the ctypes wrapper recieves into Message types shared by a range of sizes,
+# which are sliced to the size of the message
+_padded_messages = getattr(wrapper, 'PADDED_MESSAGES', False)
+
 
 if hasattr(wrapper, 'create_writable_buffer'):
     create_writable_buffer = wrapper.create_writable_buffer
@@ -46,16 +75,27 @@ class NanoMsgError(Exception):
 class NanoMsgAPIError(NanoMsgError):
     """Exception for all errors reported by the C API.
 
-    msg and errno are from nanomsg C library.
+    msg and errno are from nanomsg C library. errno defaults to the current
+    nn_errno, msg is only looked up with nn_strerror when it is used.
 
     """
-    __slots__ = ('msg', 'errno')
+    __slots__ = ('_msg', 'errno')
 
-    def __init__(self):
-        errno = wrapper.nn_errno()
-        msg = wrapper.nn_strerror(errno)
-        NanoMsgError.__init__(self, msg)
-        self.errno, self.msg = errno, msg
+    def __init__(self, errno=None):
+        if errno is None:
+            errno = wrapper.nn_errno()
+        NanoMsgError.__init__(self, errno)
+        self.errno = errno
+        self._msg = None
+
+    @property
+    def msg(self):
+        if self._msg is None:
+            self._msg = wrapper.nn_strerror(self.errno)
+        return self._msg
+
+    def __str__(self):
+        return self.msg
 
 
 def _nn_check_positive_rtn(rtn):
@@ -64,6 +104,126 @@ def _nn_check_positive_rtn(rtn):
     return rtn
 
 
+def _iter_chunks(source, chunk_size):
+    """Yields the chunks of a file like object or iterable of buffers"""
+    if hasattr(source, 'readinto'):
+        view = memoryview(bytearray(chunk_size))
+        while True:
+            size = source.readinto(view)
+            if not size:
+                return
+            yield view[:size]
+    elif hasattr(source, 'read'):
+        while True:
+            chunk = source.read(chunk_size)
+            if not chunk:
+                return
+            yield chunk
+    else:
+        for chunk in source:
+            yield chunk
+
+
+def _stream_frames(source, chunk_size):
+    """Yields (buffers, payload size) for each message of a stream sent with
+    Socket.send_stream, the last one is the end of the stream"""
+    header = Socket._STREAM_HEADER
+    sequence = 0
+    for chunk in _iter_chunks(source, chunk_size):
+        if not len(chunk):
+            continue
+        yield [header.pack(Socket._STREAM_CHUNK, sequence), chunk], len(chunk)
+        sequence = (sequence + 1) & 0xffffffff
+    yield [header.pack(Socket._STREAM_END, sequence)], 0
+
+
+def _stream_chunk(msg, expected):
+    """Returns the payload of the stream message msg as a memoryview, or None
+    at the end of the stream. expected is its sequence number."""
+    header = Socket._STREAM_HEADER
+    view = memoryview(msg)
+    if len(view) < header.size:
+        raise NanoMsgError('Stream frame is too short (%d bytes)' % (
+            len(view),))
+    kind, sequence = header.unpack_from(view)
+    if sequence != expected:
+        raise NanoMsgError('Stream frame %d recieved, expected %d' % (
+            sequence, expected))
+    if kind == Socket._STREAM_END:
+        return None
+    return view[header.size:]
+
+
+@_contextlib.contextmanager
+def _map_file_range(path, offset, length):
+    """Memory maps length bytes of the file at path starting at offset and
+    yields a memoryview of them, length defaults to the rest of the file.
+
+    The view is released before the mapping is closed, which fails while a
+    buffer export of the mapping is alive (e.g. cffi on PyPy).
+    """
+    import mmap
+    with open(path, 'rb') as f:
+        file_size = _os.fstat(f.fileno()).st_size
+        if length is None:
+            length = file_size - offset
+        if offset < 0 or length < 0 or offset + length > file_size:
+            raise ValueError('offset %r and length %r are outside the '
+                             'file (%r bytes)' % (offset, length, file_size))
+        if length == 0:
+            yield memoryview(b'')
+            return
+        start = offset - offset % mmap.ALLOCATIONGRANULARITY
+        # a copy-on-write mapping is writable from Python's point of view
+        # which lets the ctypes wrapper take its address without copying,
+        # the pages are never written so nothing is copied
+        mapped = mmap.mmap(f.fileno(), offset + length - start,
+                           access=mmap.ACCESS_COPY, offset=start)
+        try:
+            with memoryview(mapped) as view:
+                with view[offset - start:] as data:
+                    yield data
+        finally:
+            mapped.close()
+
+
+@_contextlib.contextmanager
+def _map_new_file(path, size):
+    """Creates or truncates the file at path to size bytes and yields a
+    writable memory mapping of it, or None if size is 0"""
+    import mmap
+    with open(path, 'w+b') as f:
+        if size == 0:
+            yield None
+            return
+        f.truncate(size)
+        mapped = mmap.mmap(f.fileno(), size)
+        try:
+            yield mapped
+        finally:
+            mapped.close()
+
+
+def _write_file(path, msg):
+    """Writes msg to the file at path through a memory mapping, returns its
+    size"""
+    with memoryview(msg) as view:
+        size = len(view)
+        with _map_new_file(path, size) as mapped:
+            if mapped is not None:
+                mapped.write(view)
+    return size
+
+
+def _truncate_file(path, rtn, size):
+    """Truncates the file at path of size bytes to the rtn bytes recieved
+    into it, returns rtn"""
+    if rtn < size:
+        with open(path, 'r+b') as f:
+            f.truncate(rtn)
+    return rtn
+
+
 class Device(object):
     """Create a nanomsg device to relay messages between sockets.
 
@@ -72,6 +232,7 @@ class Device(object):
     def __init__(self, socket1, socket2=None):
         self._fd1 = socket1.fd
         self._fd2 = -1 if socket2 is None else socket2.fd
+        self._sockets = [socket1] if socket2 is None else [socket1, socket2]
 
     def start(self):
         """Run the device in the current thread.
@@ -81,6 +242,76 @@ class Device(object):
         """
         _nn_check_positive_rtn(wrapper.nn_device(self._fd1, self._fd2))
 
+    def start_background(self):
+        """Run the device in a new daemon thread.
+
+        The GIL is released while the device runs. Returns a DeviceThread
+        which can stop this device without terminating all other sockets.
+        """
+        thread = DeviceThread(self)
+        thread.start()
+        return thread
+
+
+class DeviceThread(_threading.Thread):
+    """A Device running in a background thread, see Device.start_background.
+
+    messages_forwarded and bytes_forwarded count what the device's sockets
+    have sent since it was started.
+    """
+
+    def __init__(self, device):
+        _threading.Thread.__init__(self, name='nanomsg-device-%d' % (
+            device._fd1,))
+        self.daemon = True
+        self.error = None
+        self._device = device
+        self._stopping = False
+        self._baseline = self._sent_totals()
+        self._final = None
+
+    def _sent_totals(self):
+        messages, nbytes = 0, 0
+        for socket in self._device._sockets:
+            sent = wrapper.nn_get_statistics(
+                socket.fd, [STAT_MESSAGES_SENT, STAT_BYTES_SENT])
+            messages += max(0, sent[0])
+            nbytes += max(0, sent[1])
+        return messages, nbytes
+
+    def _forwarded(self):
+        if self._final is not None:
+            return self._final
+        messages, nbytes = self._sent_totals()
+        return messages - self._baseline[0], nbytes - self._baseline[1]
+
+    @property
+    def messages_forwarded(self):
+        return self._forwarded()[0]
+
+    @property
+    def bytes_forwarded(self):
+        return self._forwarded()[1]
+
+    def run(self):
+        try:
+            self._device.start()
+        except NanoMsgAPIError as e:
+            if not self._stopping:
+                self.error = e
+
+    def stop(self, timeout=None):
+        """Stop the device by closing its sockets and wait for the thread.
+
+        Other sockets are not affected, unlike terminate_all.
+        """
+        if self._final is None:
+            self._final = self._forwarded()
+        self._stopping = True
+        for socket in self._device._sockets:
+            socket.close()
+        self.join(timeout)
+
 
 def terminate_all():
     """Close all sockets and devices"""
@@ -91,6 +322,24 @@ def terminate_all():
     wrapper.nn_term()
 
 
+def statistics_snapshot():
+    """Returns a dict of socket fd => Socket.statistics() for every open
+    Socket.
+
+    Sockets closed by other means than Socket.close are left out.
+    """
+    snapshot = {}
+    for socket in list(_open_sockets):
+        fd = socket.fd
+        if fd < 0 or fd in snapshot:
+            continue
+        try:
+            snapshot[fd] = socket.statistics()
+        except NanoMsgAPIError:
+            pass
+    return snapshot
+
+
 def poll(in_sockets, out_sockets, timeout=-1):
     """
     Poll a list of sockets
@@ -127,11 +376,102 @@ def poll(in_sockets, out_sockets, timeout=-1):
     return read_list, write_list
 
 
+class Poller(object):
+    """A set of sockets that can be polled repeatedly.
+
+    The nn_pollfd array passed to nn_poll is kept between calls and only
+    updated by register, modify and unregister, so the cost of poll depends
+    on the number of ready sockets rather than on building the request.
+
+    e.g.:
+        poller = Poller()
+        poller.register(socket1, POLLIN)
+        poller.register(socket2, POLLIN | POLLOUT)
+        for socket, events in poller.poll(1):
+            if events & POLLIN:
+                socket.recv()
+    """
+
+    _POLLFD = _Struct(str('ihh'))  # struct nn_pollfd
+
+    def __init__(self):
+        self._sockets = []
+        # socket => index in _sockets and _fds, by socket rather than fd as
+        # the fd of a closed socket is -1
+        self._index = {}
+        self._fds = bytearray(Poller._POLLFD.size*8)
+
+    def __len__(self):
+        return len(self._sockets)
+
+    def register(self, socket, events=None):
+        """Add a socket or change the events it is polled for.
+
+        events defaults to POLLIN
+        """
+        if events is None:
+            events = POLLIN
+        if socket in self._index:
+            return self.modify(socket, events)
+        index = len(self._sockets)
+        size = Poller._POLLFD.size
+        if (index + 1)*size > len(self._fds):
+            # reallocate rather than resize in place as the wrappers may
+            # still hold an export of the old buffer
+            fds = bytearray(len(self._fds)*2)
+            fds[:len(self._fds)] = self._fds
+            self._fds = fds
+        Poller._POLLFD.pack_into(self._fds, index*size, socket.fd, events, 0)
+        self._index[socket] = index
+        self._sockets.append(socket)
+
+    def modify(self, socket, events):
+        """Change the events a registered socket is polled for"""
+        offset = self._index[socket]*Poller._POLLFD.size
+        # keep the fd it was registered with
+        fd = Poller._POLLFD.unpack_from(self._fds, offset)[0]
+        Poller._POLLFD.pack_into(self._fds, offset, fd, events, 0)
+
+    def unregister(self, socket):
+        """Remove a socket"""
+        size = Poller._POLLFD.size
+        index = self._index.pop(socket)
+        last = len(self._sockets) - 1
+        if index != last:
+            # move the last entry into the gap
+            self._fds[index*size:(index + 1)*size] = \
+                self._fds[last*size:(last + 1)*size]
+            moved = self._sockets[last]
+            self._sockets[index] = moved
+            self._index[moved] = index
+        self._sockets.pop()
+
+    def poll(self, timeout=-1):
+        """
+        Poll the registered sockets
+        :param timeout: poll timeout in seconds, -1 is infinite wait
+        :return: list of (socket, events) tuples for the ready sockets
+        """
+        if timeout >= 0:
+            timeout_ms = int(timeout*1000)
+        else:
+            timeout_ms = -1
+        res, ready = wrapper.nn_poll_array(self._fds, len(self._sockets),
+                                           timeout_ms)
+        _nn_check_positive_rtn(res)
+        sockets = self._sockets
+        return [(sockets[index], events) for index, events in ready]
+
+
 class Socket(object):
     """Class wrapping nanomsg socket.
 
     protocol should be a nanomsg protocol constant e.g. nanomsg.PAIR
 
+    codec is the name of a codec or a Codec instance used by send_obj and
+    recv_obj, see nanomsg.codecs. The default 'raw' codec sends and recieves
+    bytes. Only use 'pickle' with trusted peers.
+
     This class supports being used as a context manager which should guarantee
     it is closed.
 
@@ -159,7 +499,11 @@ class Socket(object):
 
     """
 
-    _INT_PACKER = _Struct(str('i'))
+    _INT_SIZE = _Struct(str('i')).size
+    # send_stream/recv_stream frame header: kind, sequence number
+    _STREAM_HEADER = _Struct(str('!BI'))
+    _STREAM_CHUNK = 0
+    _STREAM_END = 1
 
     class _Endpoint(object):
         def __init__(self, socket, endpoint_id, address):
@@ -196,7 +540,16 @@ class Socket(object):
             raise NotImplementedError(
                 "Shutdown of nanoconfig endpoint is not supported")
 
-    def __init__(self, protocol=None, socket_fd=None, domain=AF_SP):
+    def __init__(self, protocol=None, socket_fd=None, domain=AF_SP,
+                 instrument=None, codec='raw'):
+        self._stats = None
+        self._codec = codec
+        # immutable options cached on first use
+        self._send_fd = self._recv_fd = None
+        self._domain = self._protocol = None
+        if instrument is None:
+            instrument = _get_instrumentation()
+        self.instrumented = instrument
         if protocol is not None and socket_fd is not None:
             raise NanoMsgError('Only one of protocol or socket_fd should be '
                                'passed to the Socket constructor')
@@ -207,12 +560,28 @@ class Socket(object):
         else:
             self._fd = socket_fd
         self._endpoints = []
+        if self._fd is not None and self._fd >= 0:
+            _open_sockets.add(self)
 
     def _get_send_fd(self):
-        return self.get_int_option(SOL_SOCKET, SNDFD)
+        if self._send_fd is None:
+            self._send_fd = self.get_int_option(SOL_SOCKET, SNDFD)
+        return self._send_fd
 
     def _get_recv_fd(self):
-        return self.get_int_option(SOL_SOCKET, RCVFD)
+        if self._recv_fd is None:
+            self._recv_fd = self.get_int_option(SOL_SOCKET, RCVFD)
+        return self._recv_fd
+
+    def _get_domain(self):
+        if self._domain is None:
+            self._domain = self.get_int_option(SOL_SOCKET, DOMAIN)
+        return self._domain
+
+    def _get_protocol(self):
+        if self._protocol is None:
+            self._protocol = self.get_int_option(SOL_SOCKET, PROTOCOL)
+        return self._protocol
 
     def _get_linger(self):
         return self.get_int_option(SOL_SOCKET, LINGER)
@@ -258,6 +627,8 @@ class Socket(object):
 
     send_fd = property(_get_send_fd, doc='Send file descripter')
     recv_fd = property(_get_recv_fd, doc='Receive file descripter')
+    domain = property(_get_domain, doc='Socket domain e.g. AF_SP')
+    protocol = property(_get_protocol, doc='Socket protocol e.g. PAIR')
     linger  = property(_get_linger, _set_linger, doc='Socket linger in '
                        'milliseconds (0.001 seconds)')
     recv_buffer_size = property(_get_recv_buffer_size, _set_recv_buffer_size,
@@ -281,6 +652,38 @@ class Socket(object):
         doc='Max reconnect interval - see C API documentation.'
     )
 
+    def _get_instrumented(self):
+        return self._stats is not None
+
+    def _set_instrumented(self, value):
+        if not value:
+            self._stats = None
+        elif self._stats is None:
+            from .instrumentation import SocketStats
+            self._stats = SocketStats()
+
+    instrumented = property(
+        _get_instrumented,
+        _set_instrumented,
+        doc='Whether send and recv calls are recorded, see Socket.stats.'
+    )
+
+    def _get_codec(self):
+        # a codec name, strings have an encode method too
+        if isinstance(self._codec, (bytes, type(''))):
+            from .codecs import get_codec
+            self._codec = get_codec(self._codec)
+        return self._codec
+
+    def _set_codec(self, value):
+        self._codec = value
+
+    codec = property(
+        _get_codec,
+        _set_codec,
+        doc='Codec used by send_obj and recv_obj, see nanomsg.codecs.'
+    )
+
     @property
     def fd(self):
         """Socket file descripter.
@@ -342,6 +745,10 @@ class Socket(object):
         if self.is_open():
             fd = self._fd
             self._fd = -1
+            # the cached options belong to the closed socket
+            self._send_fd = self._recv_fd = None
+            self._domain = self._protocol = None
+            _open_sockets.discard(self)
             if self.uses_nanoconfig:
                 wrapper.nc_close(fd)
             else:
@@ -356,34 +763,278 @@ class Socket(object):
         """
         return self.fd >= 0
 
-    def recv(self, buf=None, flags=0):
-        """Recieve a message."""
+    def recv(self, buf=None, flags=0, copy=True):
+        """Recieve a message.
+
+        By default the message is copied into a new bytes object. If copy is
+        False and no buf is passed the nanomsg allocated message is returned
+        as is, it supports the buffer protocol and the underlying memory is
+        freed (nn_freemsg) when it is garbage collected. If copy is False and
+        a buf is passed a memoryview over the received part of buf is
+        returned.
+        """
+        return self._recv(buf, flags, copy, True)
+
+    def try_recv(self, buf=None, flags=0, copy=True):
+        """Recieve a message if one is queued, otherwise return None.
+
+        Unlike recv(flags=DONTWAIT) no exception is created when there is no
+        message, which makes draining a socket cheaper. See recv for the
+        arguments.
+        """
+        return self._recv(buf, flags | DONTWAIT, copy, False)
+
+    def _recv(self, buf, flags, copy, raise_eagain):
+        stats = self._stats
+        if stats is not None:
+            start = _timer()
         if buf is None:
             rtn, out_buf = wrapper.nn_recv(self.fd, flags)
         else:
             rtn, out_buf = wrapper.nn_recv(self.fd, buf, flags)
+        if stats is not None:
+            call_end = _timer()
+            if rtn < 0:
+                stats.recv.record(start, call_end, call_end, rtn)
+        if rtn < 0:
+            errno = wrapper.nn_errno()
+            if errno == EAGAIN and not raise_eagain:
+                return None
+            raise NanoMsgAPIError(errno)
+        if not copy:
+            if buf is None:
+                result = out_buf
+                if _padded_messages and len(out_buf) != rtn:
+                    result = memoryview(out_buf)[:rtn]
+            else:
+                result = memoryview(out_buf)[:rtn]
+        else:
+            result = bytes(buffer(out_buf)[:rtn])
+        if stats is not None:
+            stats.recv.record(start, call_end, _timer(), rtn)
+        return result
+
+    def recv_into(self, pool, flags=0):
+        """Recieve a message into a buffer leased from pool.
+
+        pool is a nanomsg.buffers.BufferPool, returns a BufferLease whose
+        view covers the message. Release the lease (or use it as a context
+        manager) to give the buffer back to the pool.
+        """
+        lease = pool.acquire()
+        try:
+            rtn, _ = wrapper.nn_recv(self.fd, lease._slab, flags)
+            _nn_check_positive_rtn(rtn)
+        except:
+            lease.release()
+            raise
+        lease._set_message_size(rtn)
+        return lease
+
+    def recv_many(self, max_count, flags=0, copy=True):
+        """Recieve up to max_count messages in one call.
+
+        Only the first receive honours flags (e.g. blocks), after that only
+        messages that are already queued are collected. An error is only
+        raised if no message could be received, messages are never dropped.
+        See recv for the meaning of copy.
+        """
+        rtn, msgs = wrapper.nn_recv_many(self.fd, max_count, flags)
+        if not msgs:
+            _nn_check_positive_rtn(rtn)
+        if copy:
+            return [bytes(buffer(msg)) for msg in msgs]
+        return msgs
+
+    def send_many(self, msgs, flags=0):
+        """Send each message in msgs, returns the number of messages sent.
+
+        Sending stops at the first error, e.g. EAGAIN when passing DONTWAIT,
+        an error is only raised if no message could be sent.
+        """
+        sent, rtn = wrapper.nn_send_many(self.fd, msgs, flags)
+        if sent == 0:
+            _nn_check_positive_rtn(rtn)
+        return sent
+
+    def recvmsg_into(self, buffers, flags=0):
+        """Recieve a message scattered over a sequence of writable buffers.
+
+        Returns the size of the message, if this is larger than the combined
+        size of the buffers the message was truncated.
+        """
+        return _nn_check_positive_rtn(
+            wrapper.nn_recvmsg(self.fd, buffers, flags))
+
+    def sendmsg(self, buffers, flags=0, control=None):
+        """Send the concatenation of a sequence of buffers as one message.
+
+        The buffers are gathered by nanomsg so no intermediate copy is made.
+        control is control data as returned by recvmsg, e.g. to route a reply
+        on a raw socket.
+        """
+        if control is None:
+            rtn = wrapper.nn_sendmsg(self.fd, buffers, flags)
+        else:
+            rtn = wrapper.nn_sendmsg(self.fd, buffers, flags, control)
+        return _nn_check_positive_rtn(rtn)
+
+    def recvmsg(self, flags=0):
+        """Recieve a message and its control data, returns (message, control).
+
+        The message is returned as with recv(copy=False). control is bytes
+        or None, on raw (AF_SP_RAW) sockets it holds the routing header which
+        must be passed back to sendmsg to send a reply.
+        """
+        rtn, message, control = wrapper.nn_recvmsg_control(self.fd, flags)
         _nn_check_positive_rtn(rtn)
-        return bytes(buffer(out_buf))[:rtn]
+        return message, control
+
+    def statistics(self):
+        """Returns a dict of the socket's nanomsg statistics.
+
+        Keys are the NN_STAT_* names in lower case without the prefix e.g.
+        'messages_sent', 'bytes_received', 'dropped_connections'.
+        """
+        values = wrapper.nn_get_statistics(self.fd,
+                                           [stat for _, stat in _STATISTICS])
+        if any(value < 0 for value in values):
+            raise NanoMsgAPIError()
+        return dict(zip([name for name, _ in _STATISTICS], values))
+
+    def send_stream(self, source, chunk_size=1024*1024, flags=0):
+        """Send a large payload as a stream of chunks, see recv_stream.
+
+        source is a file like object, read chunk_size bytes at a time into a
+        reused buffer, or an iterable of byte buffers sent as they are. Each
+        chunk carries a small header so the peer can check their order, so
+        only use this with a single peer (e.g. PAIR, or PUSH with one PULL).
+        Returns the number of payload bytes sent.
+        """
+        total = 0
+        for buffers, size in _stream_frames(source, chunk_size):
+            if size:
+                self.sendmsg(buffers, flags)
+            else:
+                self._send(buffers[0], flags)
+            total += size
+        return total
+
+    def recv_stream(self, flags=0):
+        """Generator recieving a stream sent with send_stream.
+
+        Yields a memoryview over each chunk as it arrives, the chunks are not
+        copied so memory use is bounded by the chunk size, write them out or
+        copy them before keeping them.
+        """
+        expected = 0
+        while True:
+            chunk = _stream_chunk(self._recv(None, flags, False, True),
+                                  expected)
+            if chunk is None:
+                return
+            expected = (expected + 1) & 0xffffffff
+            yield chunk
+
+    def send_file(self, path, offset=0, length=None, flags=0):
+        """Send length bytes of the file at path starting at offset as one
+        message.
+
+        The file is memory mapped and the mapping passed to nn_send, so it is
+        not read into a Python object first. length defaults to the rest of
+        the file, returns the number of bytes sent.
+        """
+        with _map_file_range(path, offset, length) as data:
+            self._send(data, flags)
+            length = len(data)
+        return length
+
+    def recv_file(self, path, size=None, flags=0):
+        """Recieve a message into the file at path, which is created or
+        truncated.
+
+        If size is given the message is recieved directly into a memory
+        mapping of that many bytes (a larger message is truncated to size),
+        otherwise the message is recieved from nanomsg and copied once into
+        a mapping of its size. Returns the size of the message.
+        """
+        if size is not None and size < 1:
+            raise ValueError('size must be at least 1')
+        if size is None:
+            return _write_file(path, self._recv(None, flags, False, True))
+        with _map_new_file(path, size) as mapped:
+            with memoryview(mapped) as view:
+                rtn, _ = wrapper.nn_recv(self.fd, view, flags)
+            _nn_check_positive_rtn(rtn)
+        return _truncate_file(path, rtn, size)
+
+    def send_obj(self, obj, flags=0):
+        """Serialize obj with the socket's codec and send it as one message"""
+        buffers = self.codec.encode(obj)
+        if len(buffers) == 1:
+            self._send(buffers[0], flags)
+        else:
+            self.sendmsg(buffers, flags)
+
+    def recv_obj(self, flags=0):
+        """Recieve a message and deserialize it with the socket's codec.
+
+        The message is not copied before decoding so the result may reference
+        it (e.g. arrays from pickle out-of-band buffers).
+
+        Warning: with the 'pickle' codec any peer able to send to the socket
+        can run arbitrary code in this process. Only use it when every peer
+        is trusted.
+        """
+        from .codecs import _byte_view
+        return self.codec.decode(_byte_view(self._recv(None, flags, False,
+                                                       True)))
+
+    def send_array(self, array, flags=0):
+        """Send a numpy array, its data is sent without being copied if it
+        is contiguous. Requires numpy, see nanomsg.codecs.ArrayCodec"""
+        from .codecs import _get_array_codec
+        self.sendmsg(_get_array_codec().encode(array), flags)
+
+    def recv_array(self, flags=0):
+        """Recieve an array sent with send_array.
+
+        The array views the received message instead of copying it.
+        """
+        from .codecs import _byte_view, _get_array_codec
+        return _get_array_codec().decode(_byte_view(self._recv(None, flags,
+                                                               False, True)))
 
     def set_string_option(self, level, option, value):
         _nn_check_positive_rtn(wrapper.nn_setsockopt(self.fd, level, option,
                                value))
 
     def set_int_option(self, level, option, value):
-        buf = create_writable_buffer(Socket._INT_PACKER.size)
-        Socket._INT_PACKER.pack_into(buf, 0, value)
-        _nn_check_positive_rtn(wrapper.nn_setsockopt(self.fd, level, option,
-                                                     buf))
+        _nn_check_positive_rtn(wrapper.nn_setsockopt_int(self.fd, level,
+                                                         option, value))
 
     def get_int_option(self, level, option):
-        size = Socket._INT_PACKER.size
-        buf = create_writable_buffer(size)
-        rtn, length = wrapper.nn_getsockopt(self._fd, level, option, buf)
+        rtn, value, length = wrapper.nn_getsockopt_int(self._fd, level, option)
         _nn_check_positive_rtn(rtn)
-        if length != size:
+        if length != Socket._INT_SIZE:
             raise NanoMsgError(('Returned option size (%r) should be the same'
-                                ' as size of int (%r)') % (length, size))
-        return Socket._INT_PACKER.unpack_from(buffer(buf))[0]
+                                ' as size of int (%r)') % (length,
+                                                           Socket._INT_SIZE))
+        return value
+
+    def set_options(self, options):
+        """Set several options in one call.
+
+        options is a dict of (level, option) => value or a sequence of
+        (level, option, value), int values are set as with set_int_option and
+        others as with set_string_option. Options are set in order and an
+        error stops at the failing option.
+        """
+        if hasattr(options, 'items'):
+            options = [(level, option, value)
+                       for (level, option), value in options.items()]
+        rtn, count = wrapper.nn_setsockopt_many(self.fd, options)
+        _nn_check_positive_rtn(rtn)
 
     def get_string_option(self, level, option, max_len=16*1024):
         buf = create_writable_buffer(max_len)
@@ -393,7 +1044,62 @@ class Socket(object):
 
     def send(self, msg, flags=0):
         """Send a message"""
-        _nn_check_positive_rtn(wrapper.nn_send(self.fd, msg, flags))
+        stats = self._stats
+        if stats is None:
+            _nn_check_positive_rtn(wrapper.nn_send(self.fd, msg, flags))
+            return
+        start = _timer()
+        rtn = wrapper.nn_send(self.fd, msg, flags)
+        call_end = _timer()
+        if rtn < 0:
+            stats.send.record(start, call_end, call_end, rtn)
+            raise NanoMsgAPIError()
+        stats.send.record(start, call_end, _timer(), rtn)
+
+    # used by the other methods so subclasses can override send (e.g. as a
+    # coroutine, see nanomsg.asyncio) without breaking them
+    _send = send
+
+    def try_send(self, msg, flags=0):
+        """Send a message if it can be sent without blocking.
+
+        Returns True if the message was sent and False if it would block,
+        without creating an exception as send(flags=DONTWAIT) does.
+        """
+        stats = self._stats
+        if stats is not None:
+            start = _timer()
+        rtn = wrapper.nn_send(self.fd, msg, flags | DONTWAIT)
+        if stats is not None:
+            call_end = _timer()
+        if rtn < 0:
+            errno = wrapper.nn_errno()
+            if stats is not None:
+                stats.send.record(start, call_end, call_end, rtn)
+            if errno == EAGAIN:
+                return False
+            raise NanoMsgAPIError(errno)
+        if stats is not None:
+            stats.send.record(start, call_end, _timer(), rtn)
+        return True
+
+    def stats(self):
+        """Returns a snapshot of the send/recv instrumentation data or None
+        if the socket is not instrumented.
+
+        For each of 'send' and 'recv' there are calls, errors and bytes
+        counters plus blocked_us (time in nn_send/nn_recv), overhead_us
+        (remaining time in the method, e.g. copying) and size_bytes
+        histograms summarised by count, min, max, mean and percentiles.
+        """
+        if self._stats is None:
+            return None
+        return self._stats.snapshot()
+
+    def reset_stats(self):
+        """Reset the instrumentation data"""
+        if self._stats is not None:
+            self._stats.reset()
 
     def __enter__(self):
         return self
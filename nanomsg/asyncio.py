@@ -0,0 +1,281 @@
+"""asyncio support for nanomsg sockets.
+
+Requires Python 3.5+. The SNDFD/RCVFD file descriptors of the socket are
+registered with the event loop so a single thread can serve many sockets e.g.:
+
+    import asyncio
+    from nanomsg import REP
+    from nanomsg.asyncio import AsyncSocket
+
+    async def serve():
+        with AsyncSocket(REP) as socket:
+            socket.bind('tcp://127.0.0.1:49234')
+            while True:
+                request = await socket.recv()
+                await socket.send(request)
+
+    asyncio.get_event_loop().run_until_complete(serve())
+"""
+from __future__ import division, absolute_import, print_function, unicode_literals
+
+import asyncio
+
+from . import (
+    AF_SP,
+    DONTWAIT,
+    EAGAIN,
+    SURVEYOR,
+    NanoMsgAPIError,
+    SURVEYOR_DEADLINE,
+    Socket,
+    _map_file_range,
+    _map_new_file,
+    _nn_check_positive_rtn,
+    _stream_chunk,
+    _stream_frames,
+    _truncate_file,
+    _write_file,
+    wrapper,
+)
+from .survey import Surveyor, _SURVEY_ENDED, _responses
+
+
+class _FdWaiters(object):
+    """Futures waiting for an OS file descriptor to become ready.
+
+    The descriptor is only registered with the loop while there are waiters,
+    all waiters are woken together when it becomes ready.
+    """
+
+    def __init__(self, loop, fd, add, remove):
+        self._loop = loop
+        self._fd = fd
+        self._add = add
+        self._remove = remove
+        self._futures = []
+
+    def wait(self):
+        future = self._loop.create_future()
+        if not self._futures:
+            self._add(self._fd, self._wake)
+        self._futures.append(future)
+        future.add_done_callback(self._discard)
+        return future
+
+    def _discard(self, future):
+        """Forget a future cancelled while waiting, e.g. by wait_for"""
+        if future.cancelled() and future in self._futures:
+            self._futures.remove(future)
+            if not self._futures:
+                self._remove(self._fd)
+
+    def _wake(self):
+        self._remove(self._fd)
+        futures, self._futures = self._futures, []
+        for future in futures:
+            if not future.done():
+                future.set_result(None)
+
+    def cancel(self):
+        if self._futures:
+            self._remove(self._fd)
+        futures, self._futures = self._futures, []
+        for future in futures:
+            future.cancel()
+
+
+class _AsyncStream(object):
+    """Asynchronous iterator over the chunks of a stream, see
+    AsyncSocket.recv_stream"""
+
+    def __init__(self, socket, flags):
+        self._socket = socket
+        self._flags = flags
+        self._expected = 0
+
+    def __aiter__(self):
+        return self
+
+    async def __anext__(self):
+        if self._expected is None:
+            raise StopAsyncIteration
+        chunk = _stream_chunk(await self._socket.recv(flags=self._flags,
+                                                      copy=False),
+                              self._expected)
+        if chunk is None:
+            self._expected = None
+            raise StopAsyncIteration
+        self._expected = (self._expected + 1) & 0xffffffff
+        return chunk
+
+
+class AsyncSocket(Socket):
+    """Socket with coroutine send and recv methods.
+
+    Operations are attempted with try_recv/try_send and when they would block
+    the coroutine waits for the socket's send_fd/recv_fd to become ready in
+    the event loop before retrying.
+
+    The event loop defaults to the one running the coroutine. The other
+    arguments are those of Socket.
+    """
+
+    def __init__(self, *args, loop=None, **kwargs):
+        self._loop = loop
+        self._recv_waiters = None
+        self._send_waiters = None
+        Socket.__init__(self, *args, **kwargs)
+
+    def _get_loop(self):
+        if self._loop is None:
+            self._loop = asyncio.get_event_loop()
+        return self._loop
+
+    def _wait_recv(self):
+        if self._recv_waiters is None:
+            loop = self._get_loop()
+            self._recv_waiters = _FdWaiters(loop, self.recv_fd,
+                                            loop.add_reader,
+                                            loop.remove_reader)
+        return self._recv_waiters.wait()
+
+    def _wait_send(self):
+        if self._send_waiters is None:
+            loop = self._get_loop()
+            # nanomsg signals the send fd as readable when sending is possible
+            self._send_waiters = _FdWaiters(loop, self.send_fd,
+                                            loop.add_reader,
+                                            loop.remove_reader)
+        return self._send_waiters.wait()
+
+    async def recv(self, buf=None, flags=0, copy=True):
+        """Recieve a message, see Socket.recv."""
+        while True:
+            result = self.try_recv(buf, flags, copy)
+            if result is not None:
+                return result
+            await self._wait_recv()
+
+    async def send(self, msg, flags=0):
+        """Send a message, see Socket.send."""
+        while not self.try_send(msg, flags):
+            await self._wait_send()
+
+    async def _send_buffers(self, buffers, flags):
+        if len(buffers) == 1:
+            await self.send(buffers[0], flags)
+            return
+        while True:
+            try:
+                self.sendmsg(buffers, flags | DONTWAIT)
+                return
+            except NanoMsgAPIError as e:
+                if e.errno != EAGAIN:
+                    raise
+            await self._wait_send()
+
+    async def send_obj(self, obj, flags=0):
+        """Serialize obj with the socket's codec and send it, see
+        Socket.send_obj."""
+        await self._send_buffers(self.codec.encode(obj), flags)
+
+    async def recv_obj(self, flags=0):
+        """Recieve a message and deserialize it, see Socket.recv_obj."""
+        from .codecs import _byte_view
+        return self.codec.decode(_byte_view(await self.recv(flags=flags,
+                                                            copy=False)))
+
+    async def send_array(self, array, flags=0):
+        """Send a numpy array, see Socket.send_array."""
+        from .codecs import _get_array_codec
+        await self._send_buffers(_get_array_codec().encode(array), flags)
+
+    async def recv_array(self, flags=0):
+        """Recieve a numpy array, see Socket.recv_array."""
+        from .codecs import _byte_view, _get_array_codec
+        return _get_array_codec().decode(_byte_view(await self.recv(
+            flags=flags, copy=False)))
+
+    async def send_stream(self, source, chunk_size=1024*1024, flags=0):
+        """Send a large payload as a stream of chunks, see
+        Socket.send_stream."""
+        total = 0
+        for buffers, size in _stream_frames(source, chunk_size):
+            await self._send_buffers(buffers, flags)
+            total += size
+        return total
+
+    def recv_stream(self, flags=0):
+        """Recieve a stream sent with send_stream, returns an asynchronous
+        iterator (async for) over the chunks, see Socket.recv_stream."""
+        return _AsyncStream(self, flags)
+
+    async def send_file(self, path, offset=0, length=None, flags=0):
+        """Send part of a file as one message, see Socket.send_file."""
+        with _map_file_range(path, offset, length) as data:
+            await self.send(data, flags)
+            return len(data)
+
+    async def recv_file(self, path, size=None, flags=0):
+        """Recieve a message into a file, see Socket.recv_file."""
+        if size is not None and size < 1:
+            raise ValueError('size must be at least 1')
+        if size is None:
+            return _write_file(path, await self.recv(flags=flags, copy=False))
+        with _map_new_file(path, size) as mapped:
+            with memoryview(mapped) as view:
+                while True:
+                    rtn, _ = wrapper.nn_recv(self.fd, view, flags | DONTWAIT)
+                    if rtn >= 0 or wrapper.nn_errno() != EAGAIN:
+                        break
+                    await self._wait_recv()
+            _nn_check_positive_rtn(rtn)
+        return _truncate_file(path, rtn, size)
+
+    def close(self):
+        """Close the socket, pending recv and send calls are cancelled"""
+        for waiters in (self._recv_waiters, self._send_waiters):
+            if waiters is not None:
+                waiters.cancel()
+        self._recv_waiters = self._send_waiters = None
+        Socket.close(self)
+
+
+class AsyncSurveyor(AsyncSocket, Surveyor):
+    """SURVEYOR socket with a coroutine survey method, see Surveyor"""
+
+    def __init__(self, socket_fd=None, domain=AF_SP, loop=None, **kwargs):
+        AsyncSocket.__init__(self, SURVEYOR if socket_fd is None else None,
+                             socket_fd, domain, loop=loop, **kwargs)
+
+    async def survey(self, payload, deadline=None, min_responses=None,
+                     copy=True):
+        """Send payload as a survey and return the list of responses, see
+        Surveyor.survey."""
+        self._set_deadline(deadline)
+        if deadline is None:
+            deadline = self.get_int_option(SURVEYOR, SURVEYOR_DEADLINE)/1000
+        await self.send(payload)
+        loop = self._get_loop()
+        end = loop.time() + deadline
+        responses = []
+        while min_responses is None or len(responses) < min_responses:
+            rtn, messages = wrapper.nn_recv_many(self.fd, self.batch_size,
+                                                 DONTWAIT)
+            if messages:
+                responses.extend(messages)
+                continue
+            errno = wrapper.nn_errno()
+            if errno in _SURVEY_ENDED:
+                break
+            if errno != EAGAIN:
+                _nn_check_positive_rtn(rtn)
+            remaining = end - loop.time()
+            if remaining <= 0:
+                break
+            try:
+                await asyncio.wait_for(self._wait_recv(), remaining)
+            except asyncio.TimeoutError:
+                # drain once more, the survey is over when that is empty
+                pass
+        return _responses(responses, copy)
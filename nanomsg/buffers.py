@@ -0,0 +1,123 @@
+"""Pools of preallocated receive buffers.
+
+A BufferPool carves one allocation into fixed size slabs which are lent out
+by Socket.recv_into and returned when the lease is released, so sustained
+receiving does not allocate e.g.:
+
+    from nanomsg.buffers import BufferPool
+
+    pool = BufferPool(64*1024, 32)
+    while True:
+        with socket.recv_into(pool) as lease:
+            process(lease.view)
+"""
+from __future__ import division, absolute_import, print_function, unicode_literals
+
+import collections
+import mmap
+
+from . import NanoMsgError, create_writable_buffer
+
+
+class BufferLease(object):
+    """A slab of a BufferPool holding a received message.
+
+    view is a memoryview bounded to the message, it is invalidated when the
+    lease is released and the slab goes back to the pool. If the message was
+    larger than the slab it was truncated, see truncated and message_size.
+    """
+
+    def __init__(self, pool, index, slab):
+        self._pool = pool
+        self._index = index
+        self._slab = slab
+        self._view = None
+        self.message_size = 0
+
+    def _set_message_size(self, size):
+        self.message_size = size
+        self._view = self._slab[:min(size, len(self._slab))]
+
+    @property
+    def view(self):
+        if self._view is None:
+            raise ValueError('lease has been released')
+        return self._view
+
+    @property
+    def truncated(self):
+        return self.message_size > len(self._slab)
+
+    def __len__(self):
+        return len(self.view)
+
+    def tobytes(self):
+        return self.view.tobytes()
+
+    def release(self):
+        """Return the slab to the pool"""
+        if self._pool is None:
+            return
+        if self._view is not None:
+            try:
+                self._view.release()
+            except (AttributeError, BufferError):
+                # py2 or the view is still exported elsewhere
+                pass
+            self._view = None
+        pool, self._pool = self._pool, None
+        pool._release(self._index)
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *args):
+        self.release()
+
+    def __del__(self):
+        self.release()
+
+
+class BufferPool(object):
+    """count buffers of slab_size bytes.
+
+    The memory is allocated once with create_writable_buffer, or as an
+    anonymous mmap if use_mmap is True. acquire raises NanoMsgError when
+    every slab is leased.
+    """
+
+    def __init__(self, slab_size, count, use_mmap=False):
+        if slab_size < 1 or count < 1:
+            raise ValueError('slab_size and count must be at least 1')
+        self.slab_size = slab_size
+        self.count = count
+        if use_mmap:
+            self._memory = mmap.mmap(-1, slab_size*count)
+        else:
+            self._memory = create_writable_buffer(slab_size*count)
+        view = memoryview(self._memory)
+        if view.format != 'B':
+            view = view.cast('B')
+        self._slabs = [view[i*slab_size:(i + 1)*slab_size]
+                       for i in range(count)]
+        # deque append and pop are atomic so leases can be used from threads
+        self._free = collections.deque(range(count))
+
+    @property
+    def available(self):
+        """Number of slabs that are not leased"""
+        return len(self._free)
+
+    def acquire(self):
+        """Lease a slab, returns a BufferLease"""
+        try:
+            index = self._free.pop()
+        except IndexError:
+            raise NanoMsgError('All %d buffers of the pool are in use' % (
+                self.count,))
+        lease = BufferLease(self, index, self._slabs[index])
+        lease._set_message_size(self.slab_size)
+        return lease
+
+    def _release(self, index):
+        self._free.append(index)
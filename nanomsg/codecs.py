@@ -0,0 +1,246 @@
+"""Serialization of Python objects for Socket.send_obj and Socket.recv_obj.
+
+A codec turns an object into a list of buffers which are sent as a single
+message with nn_sendmsg, so large buffers are gathered by nanomsg instead of
+being concatenated first, and turns a received message back into an object
+e.g.:
+
+    from nanomsg import PAIR, Socket
+
+    with Socket(PAIR, codec='pickle') as socket:
+        socket.connect('tcp://127.0.0.1:5555')
+        socket.send_obj({'weights': numpy_array})
+
+Built in codecs are 'raw' (buffers as they are, the default), 'pickle',
+'msgpack' (requires the msgpack package) and 'array' (numpy arrays, see
+Socket.send_array and Socket.recv_array).
+
+Unpickling a message can run arbitrary code, so only use 'pickle' on sockets
+whose peers are all trusted.
+"""
+from __future__ import division, absolute_import, print_function, unicode_literals
+
+import pickle
+import struct
+
+from . import NanoMsgError
+
+_PICKLE5 = pickle.HIGHEST_PROTOCOL >= 5
+
+
+def _byte_view(msg):
+    view = memoryview(msg)
+    if view.format != 'B':
+        view = view.cast('B')
+    return view
+
+
+class Codec(object):
+    """Base class of the codecs.
+
+    encode returns a list of buffers to send as one message, decode is passed
+    a memoryview of a received message and returns the object. The view is
+    over the nanomsg message itself so decode may return objects referencing
+    it rather than copies.
+    """
+
+    name = None
+
+    def encode(self, obj):
+        raise NotImplementedError
+
+    def decode(self, view):
+        raise NotImplementedError
+
+    def __repr__(self):
+        return '<%s %r>' % (self.__class__.__name__, self.name)
+
+
+class RawCodec(Codec):
+    """Sends objects supporting the buffer protocol as they are, recieves
+    bytes"""
+
+    name = 'raw'
+
+    def encode(self, obj):
+        return [obj]
+
+    def decode(self, view):
+        return view.tobytes()
+
+
+class PickleCodec(Codec):
+    """Pickles objects with the highest available protocol.
+
+    With protocol 5 (Python 3.8+) buffers of objects supporting it, e.g.
+    numpy arrays or pickle.PickleBuffer, are sent out-of-band: they are
+    passed to nn_sendmsg as they are and unpickled from views over the
+    received message instead of being copied into the pickle. Each
+    out-of-band buffer starts on a 16 byte boundary of the message.
+
+    The message is a header of the number of out-of-band buffers, the pickle
+    length and each buffer length, followed by the pickle and the buffers.
+
+    Warning: decoding unpickles the message, which can run arbitrary code.
+    Never decode messages from untrusted peers.
+    """
+
+    name = 'pickle'
+    _ALIGNMENT = 16
+    _HEADER = struct.Struct(str('!II'))
+    _PADDING = b'\0'*_ALIGNMENT
+
+    def __init__(self, protocol=None):
+        if protocol is None:
+            protocol = pickle.HIGHEST_PROTOCOL
+        self.protocol = protocol
+
+    @classmethod
+    def _padding(cls, offset):
+        return -offset % cls._ALIGNMENT
+
+    def encode(self, obj):
+        out_of_band = []
+        if self.protocol >= 5:
+            def buffer_callback(pickle_buffer):
+                try:
+                    out_of_band.append(pickle_buffer.raw())
+                except BufferError:
+                    # not contiguous, pickle it in-band
+                    return True
+                return False
+            data = pickle.dumps(obj, self.protocol,
+                                buffer_callback=buffer_callback)
+        else:
+            data = pickle.dumps(obj, self.protocol)
+        lengths = [buf.nbytes for buf in out_of_band]
+        header = self._HEADER.pack(len(out_of_band), len(data))
+        if lengths:
+            header += struct.pack(str('!%dQ' % (len(lengths),)), *lengths)
+        buffers = [header, data]
+        offset = len(header) + len(data)
+        for buf, length in zip(out_of_band, lengths):
+            padding = self._padding(offset)
+            if padding:
+                buffers.append(self._PADDING[:padding])
+            buffers.append(buf)
+            offset += padding + length
+        return buffers
+
+    def decode(self, view):
+        count, data_length = self._HEADER.unpack_from(view)
+        offset = self._HEADER.size
+        lengths = struct.unpack_from(str('!%dQ' % (count,)), view, offset)
+        offset += 8*count
+        data = view[offset:offset + data_length]
+        offset += data_length
+        if not count:
+            if _PICKLE5:
+                return pickle.loads(data)
+            return pickle.loads(data.tobytes())
+        if not _PICKLE5:
+            raise NanoMsgError('Pickle protocol 5 is required to decode '
+                               'out-of-band buffers')
+        out_of_band = []
+        for length in lengths:
+            offset += self._padding(offset)
+            out_of_band.append(view[offset:offset + length])
+            offset += length
+        return pickle.loads(data, buffers=out_of_band)
+
+
+class MsgpackCodec(Codec):
+    """Packs objects with msgpack, requires the msgpack package"""
+
+    name = 'msgpack'
+
+    def __init__(self):
+        import msgpack
+        self._msgpack = msgpack
+
+    def encode(self, obj):
+        return [self._msgpack.packb(obj, use_bin_type=True)]
+
+    def decode(self, view):
+        return self._msgpack.unpackb(view, raw=False)
+
+
+class ArrayCodec(Codec):
+    """Sends numpy arrays, requires numpy.
+
+    The message is a header carrying the dtype, shape and strides, padded to
+    16 bytes, followed by the array data which is passed to nn_sendmsg as it
+    is if the array is C or Fortran contiguous (other arrays are copied into
+    a contiguous one first). decode returns an array viewing the received
+    message, which is kept alive by the array's base.
+    """
+
+    name = 'array'
+    _MAGIC = b'NA'
+    _ALIGNMENT = 16
+    # magic, dtype string length, number of dimensions
+    _HEADER = struct.Struct(str('!2sBB'))
+
+    def __init__(self):
+        import numpy
+        self._numpy = numpy
+
+    def encode(self, array):
+        numpy = self._numpy
+        array = numpy.asanyarray(array)
+        if array.dtype.hasobject or array.dtype.names is not None:
+            raise ValueError('Arrays of dtype %r can not be sent' % (
+                array.dtype,))
+        if not (array.flags.c_contiguous or array.flags.f_contiguous):
+            array = numpy.ascontiguousarray(array)
+        dtype = array.dtype.str.encode('ascii')
+        dimensions = struct.pack(str('!%dq' % (2*array.ndim,)),
+                                 *(array.shape + array.strides))
+        header = b''.join([self._HEADER.pack(self._MAGIC, len(dtype),
+                                              array.ndim),
+                           dtype, dimensions])
+        header += b'\0'*(-len(header) % self._ALIGNMENT)
+        # ravel of a contiguous array in 'K' order is a view of its memory
+        return [header, array.ravel(order='K').view(numpy.uint8)]
+
+    def decode(self, view):
+        magic, dtype_length, ndim = self._HEADER.unpack_from(view)
+        if magic != self._MAGIC:
+            raise NanoMsgError('Message is not an array')
+        offset = self._HEADER.size
+        dtype = view[offset:offset + dtype_length].tobytes().decode('ascii')
+        offset += dtype_length
+        dimensions = struct.unpack_from(str('!%dq' % (2*ndim,)), view, offset)
+        offset += 8*2*ndim
+        offset += -offset % self._ALIGNMENT
+        return self._numpy.ndarray(dimensions[:ndim], dtype, buffer=view,
+                                   offset=offset, strides=dimensions[ndim:])
+
+
+CODECS = {
+    RawCodec.name: RawCodec,
+    PickleCodec.name: PickleCodec,
+    MsgpackCodec.name: MsgpackCodec,
+    ArrayCodec.name: ArrayCodec,
+}
+
+
+_array_codec = []
+
+
+def _get_array_codec():
+    if not _array_codec:
+        _array_codec.append(ArrayCodec())
+    return _array_codec[0]
+
+
+def get_codec(codec):
+    """Returns a Codec instance for a codec name or instance"""
+    if isinstance(codec, Codec):
+        return codec
+    try:
+        codec_class = CODECS[codec]
+    except KeyError:
+        raise NanoMsgError('Unknown codec %r, expected one of %s' % (
+            codec, ', '.join(sorted(CODECS))))
+    return codec_class()
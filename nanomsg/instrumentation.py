@@ -0,0 +1,144 @@
+"""Opt-in per socket instrumentation of Socket.send and Socket.recv.
+
+Enable it for one socket with Socket(..., instrument=True) or
+socket.instrumented = True, or for every new socket with
+nanomsg_wrappers.set_instrumentation(True) before the sockets are created.
+Socket.stats() then returns a snapshot of the counters and histograms.
+"""
+from __future__ import division, absolute_import, print_function, unicode_literals
+
+
+class Histogram(object):
+    """Fixed memory log-linear histogram of non-negative integers.
+
+    Like an HDR histogram values below 2**sub_bucket_bits are counted
+    exactly and larger values are counted in 2**(sub_bucket_bits-1) linear
+    buckets per power of two, so the recorded value is within
+    1/2**(sub_bucket_bits-1) of the real value. Values of 2**max_bits or
+    more are counted in the last bucket.
+    """
+
+    def __init__(self, sub_bucket_bits=5, max_bits=40):
+        self._sub_bucket_bits = sub_bucket_bits
+        self._sub_buckets = 1 << sub_bucket_bits
+        self._half = self._sub_buckets // 2
+        self._counts = [0]*(self._sub_buckets +
+                            (max_bits - sub_bucket_bits)*self._half)
+        self.reset()
+
+    def reset(self):
+        for i in range(len(self._counts)):
+            self._counts[i] = 0
+        self.count = 0
+        self.total = 0
+        self.min = None
+        self.max = 0
+
+    def _index(self, value):
+        if value < self._sub_buckets:
+            return value
+        shift = value.bit_length() - self._sub_bucket_bits
+        index = (self._sub_buckets + (shift - 1)*self._half +
+                 (value >> shift) - self._half)
+        return min(index, len(self._counts) - 1)
+
+    def _highest_value(self, index):
+        if index < self._sub_buckets:
+            return index
+        shift, top = divmod(index - self._sub_buckets, self._half)
+        shift += 1
+        return ((top + self._half + 1) << shift) - 1
+
+    def record(self, value):
+        self._counts[self._index(value)] += 1
+        self.count += 1
+        self.total += value
+        if self.min is None or value < self.min:
+            self.min = value
+        if value > self.max:
+            self.max = value
+
+    def percentile(self, percent):
+        """Returns the value below which percent of the values fall"""
+        if self.count == 0:
+            return 0
+        target = max(1, int(round(self.count*percent/100.0)))
+        seen = 0
+        for index, count in enumerate(self._counts):
+            seen += count
+            if seen >= target:
+                return min(self._highest_value(index), self.max)
+        return self.max
+
+    def snapshot(self):
+        return {
+            'count': self.count,
+            'min': self.min or 0,
+            'max': self.max,
+            'mean': self.total/self.count if self.count else 0.0,
+            'p50': self.percentile(50),
+            'p90': self.percentile(90),
+            'p99': self.percentile(99),
+            'p999': self.percentile(99.9),
+        }
+
+
+class OperationStats(object):
+    """Counters and histograms for one kind of socket operation.
+
+    blocked_us is the time spent inside the wrapper's nn_send/nn_recv,
+    overhead_us the rest of the time spent in the Socket method and
+    size_bytes the message sizes.
+    """
+
+    def __init__(self):
+        self.blocked_us = Histogram()
+        self.overhead_us = Histogram()
+        self.size_bytes = Histogram()
+        self.reset()
+
+    def reset(self):
+        self.calls = 0
+        self.errors = 0
+        self.bytes = 0
+        self.blocked_us.reset()
+        self.overhead_us.reset()
+        self.size_bytes.reset()
+
+    def record(self, start, call_end, end, rtn):
+        """Record a call, times are seconds from the same clock and rtn is
+        the result of the wrapper call"""
+        self.calls += 1
+        blocked = int((call_end - start)*1000000)
+        self.blocked_us.record(blocked)
+        self.overhead_us.record(max(0, int((end - start)*1000000) - blocked))
+        if rtn < 0:
+            self.errors += 1
+        else:
+            self.bytes += rtn
+            self.size_bytes.record(rtn)
+
+    def snapshot(self):
+        return {
+            'calls': self.calls,
+            'errors': self.errors,
+            'bytes': self.bytes,
+            'blocked_us': self.blocked_us.snapshot(),
+            'overhead_us': self.overhead_us.snapshot(),
+            'size_bytes': self.size_bytes.snapshot(),
+        }
+
+
+class SocketStats(object):
+    """Instrumentation data of a Socket"""
+
+    def __init__(self):
+        self.send = OperationStats()
+        self.recv = OperationStats()
+
+    def reset(self):
+        self.send.reset()
+        self.recv.reset()
+
+    def snapshot(self):
+        return {'send': self.send.snapshot(), 'recv': self.recv.snapshot()}
@@ -0,0 +1,316 @@
+"""Multiprocess PUSH/PULL pipelines.
+
+A Pipeline runs each stage function in its own pool of worker processes.
+Stages are connected over ipc with PUSH/PULL sockets. Items are streamed
+through with a bound on the number in flight and the results are collected
+in order, or as they complete, e.g.:
+
+    from nanomsg.pipeline import Pipeline
+
+    def parse(line):
+        return line.split(',')
+
+    def score(fields):
+        return len(fields)
+
+    if __name__ == '__main__':
+        with Pipeline([parse, score], workers=4) as pipeline:
+            for result in pipeline.map(open('data.csv')):
+                print(result)
+            print(pipeline.stats())
+
+Workers are started with the spawn method so stage functions, items and
+results must be picklable; stage functions must be defined at module level.
+Items are pickled over ipc sockets in a directory only the user can access.
+"""
+from __future__ import division, absolute_import, print_function, unicode_literals
+
+import multiprocessing
+import os
+import shutil
+import tempfile
+import traceback
+
+from . import (AF_SP, AF_SP_RAW, DONTWAIT, EAGAIN, ETIMEDOUT, PULL, PUSH,
+               Device, NanoMsgAPIError, NanoMsgError, Socket, _timer)
+from .instrumentation import Histogram
+
+if hasattr(multiprocessing, 'get_context'):
+    _context = multiprocessing.get_context('spawn')
+else:
+    _context = multiprocessing  # py2
+
+# send/recv timeout in ms, the longest it takes to notice stop or a dead
+# worker
+_POLL_INTERVAL = 100
+
+_NOTHING = object()
+
+
+class PipelineError(NanoMsgError):
+    """A stage function raised an exception or a worker died"""
+
+
+def _worker(function, in_address, out_address, stop):
+    """Worker process main loop, envelopes are (sequence number, item,
+    error, list of the seconds each stage spent on the item)"""
+    with Socket(PULL, codec='pickle') as pull:
+        with Socket(PUSH, codec='pickle') as push:
+            pull.recv_timeout = _POLL_INTERVAL
+            push.send_timeout = _POLL_INTERVAL
+            pull.connect(in_address)
+            push.connect(out_address)
+            while not stop.is_set():
+                try:
+                    sequence, item, error, timings = pull.recv_obj()
+                except NanoMsgAPIError as e:
+                    if e.errno == ETIMEDOUT:
+                        continue
+                    raise
+                if error is None:
+                    start = _timer()
+                    try:
+                        item = function(item)
+                    except Exception:
+                        item, error = None, traceback.format_exc()
+                    timings.append(_timer() - start)
+                envelope = (sequence, item, error, timings)
+                while not stop.is_set():
+                    try:
+                        push.send_obj(envelope)
+                        break
+                    except NanoMsgAPIError as e:
+                        if e.errno != ETIMEDOUT:
+                            raise
+
+
+class StageStats(object):
+    """Throughput of a stage, see Pipeline.stats"""
+
+    def __init__(self, name, workers):
+        self.name = name
+        self.workers = workers
+        self.busy_us = Histogram()
+        self.items = 0
+        self.errors = 0
+        self.busy_seconds = 0.0
+
+    def record(self, seconds, failed):
+        self.items += 1
+        self.errors += failed
+        self.busy_seconds += seconds
+        self.busy_us.record(int(seconds*1000000))
+
+    def snapshot(self):
+        capacity = 0.0
+        if self.busy_seconds:
+            capacity = self.items*self.workers/self.busy_seconds
+        return {
+            'name': self.name,
+            'workers': self.workers,
+            'items': self.items,
+            'errors': self.errors,
+            'busy_seconds': self.busy_seconds,
+            'items_per_second': capacity,
+            'busy_us': self.busy_us.snapshot(),
+        }
+
+
+class Pipeline(object):
+    """Runs items through stages in worker processes.
+
+    stages is a list of functions, or (function, number of workers) pairs,
+    each is applied to the result of the previous one. workers is the
+    default number of processes per stage, the number of CPUs by default.
+
+    At most max_in_flight items are sent before their results are
+    collected. With ordered=False results are yielded as they arrive.
+    """
+
+    def __init__(self, stages, workers=None, max_in_flight=1000,
+                 ordered=True):
+        if not stages:
+            raise ValueError('at least one stage is required')
+        if workers is None:
+            workers = multiprocessing.cpu_count()
+        self._stages = []
+        for stage in stages:
+            if isinstance(stage, tuple):
+                function, count = stage
+            else:
+                function, count = stage, workers
+            self._stages.append((function, count))
+        self.max_in_flight = max_in_flight
+        self.ordered = ordered
+        self._stats = [
+            StageStats(getattr(function, '__name__', repr(function)), count)
+            for function, count in self._stages]
+        # sequence numbers keep increasing across map calls so results of
+        # an abandoned map are recognised
+        self._sequence = 0
+        self._directory = None
+        self._stop = None
+        self._processes = []
+        self._sockets = []
+        self._devices = []
+        self._source = self._sink = None
+
+    def _address(self, name):
+        return 'ipc://' + os.path.join(self._directory, name + '.ipc')
+
+    def start(self):
+        """Start the worker processes, called by map if needed"""
+        if self._directory is not None:
+            return
+        self._directory = tempfile.mkdtemp(prefix='nanomsg-pipeline-')
+        self._stop = _context.Event()
+        try:
+            self._source = self._bind(PUSH, self._address('stage0'))
+            self._source.send_timeout = _POLL_INTERVAL
+            # the results of a stage are forwarded to the next stage's
+            # workers by a device
+            for index in range(1, len(self._stages)):
+                results = self._bind(PULL, self._address('results%d' % (
+                    index - 1,)), AF_SP_RAW)
+                stage = self._bind(PUSH, self._address('stage%d' % (index,)),
+                                   AF_SP_RAW)
+                self._devices.append(
+                    Device(results, stage).start_background())
+            self._sink = self._bind(PULL, self._address('results%d' % (
+                len(self._stages) - 1,)))
+            self._sink.recv_timeout = _POLL_INTERVAL
+            for index, (function, count) in enumerate(self._stages):
+                for i in range(count):
+                    process = _context.Process(
+                        target=_worker,
+                        args=(function, self._address('stage%d' % (index,)),
+                              self._address('results%d' % (index,)),
+                              self._stop),
+                        name='nanomsg-pipeline-%d-%d' % (index, i))
+                    process.daemon = True
+                    process.start()
+                    self._processes.append(process)
+        except:
+            self.close()
+            raise
+
+    def _bind(self, protocol, address, domain=AF_SP):
+        socket = Socket(protocol, domain=domain, codec='pickle')
+        self._sockets.append(socket)
+        socket.bind(address)
+        return socket
+
+    def _check_workers(self):
+        for process in self._processes:
+            if not process.is_alive():
+                raise PipelineError('Worker %s exited with code %r' % (
+                    process.name, process.exitcode))
+
+    def _send(self, envelope, block):
+        """Send an envelope to the first stage, if block is False returns
+        False instead of waiting for a worker"""
+        while True:
+            try:
+                self._source.send_obj(envelope, 0 if block else DONTWAIT)
+                return True
+            except NanoMsgAPIError as e:
+                if e.errno == EAGAIN and not block:
+                    return False
+                if e.errno != ETIMEDOUT:
+                    raise
+            self._check_workers()
+
+    def _recv(self):
+        while True:
+            try:
+                return self._sink.recv_obj()
+            except NanoMsgAPIError as e:
+                if e.errno != ETIMEDOUT:
+                    raise
+            self._check_workers()
+
+    def _result(self, item, error):
+        if error is not None:
+            raise PipelineError('Stage function failed:\n' + error)
+        return item
+
+    def map(self, items):
+        """Generator feeding items through the stages and yielding the
+        results. A stage function exception is raised as PipelineError when
+        its item's result is due."""
+        self.start()
+        items = iter(items)
+        item = _NOTHING
+        exhausted = False
+        first = next_result = self._sequence
+        in_flight = 0
+        finished = {}
+        while True:
+            while not exhausted and in_flight < self.max_in_flight:
+                if item is _NOTHING:
+                    try:
+                        item = next(items)
+                    except StopIteration:
+                        exhausted = True
+                        break
+                # only wait for a worker when there are no results to collect
+                # meanwhile
+                if not self._send((self._sequence, item, None, []),
+                                  not in_flight):
+                    break
+                item = _NOTHING
+                self._sequence += 1
+                in_flight += 1
+            if not in_flight:
+                return
+            sequence, result, error, timings = self._recv()
+            if sequence < first:
+                continue
+            in_flight -= 1
+            for index, seconds in enumerate(timings):
+                self._stats[index].record(
+                    seconds, error is not None and index == len(timings) - 1)
+            if not self.ordered:
+                yield self._result(result, error)
+                continue
+            finished[sequence] = (result, error)
+            while next_result in finished:
+                result, error = finished.pop(next_result)
+                next_result += 1
+                yield self._result(result, error)
+
+    def stats(self):
+        """Returns a list with a dict per stage.
+
+        items_per_second is the rate the stage's workers could sustain given
+        the time they spent on each item, the stage with the lowest rate is
+        the bottleneck.
+        """
+        return [stats.snapshot() for stats in self._stats]
+
+    def close(self, timeout=5):
+        """Stop the workers and remove the ipc files"""
+        if self._stop is not None:
+            self._stop.set()
+        for process in self._processes:
+            process.join(timeout)
+            if process.is_alive():
+                process.terminate()
+                process.join()
+        self._processes = []
+        for device in self._devices:
+            device.stop()
+        self._devices = []
+        for socket in self._sockets:
+            socket.close()
+        self._sockets = []
+        self._source = self._sink = None
+        if self._directory is not None:
+            shutil.rmtree(self._directory, ignore_errors=True)
+            self._directory = None
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *args):
+        self.close()
@@ -0,0 +1,166 @@
+"""A thread safe cache of connected sockets.
+
+Creating and connecting a socket for every short lived request pays for the
+socket creation, the connection handshake and often the reconnect interval
+before the first send goes out. A SocketPool keeps released sockets connected
+so they can be handed out again e.g.:
+
+    from nanomsg import REQ
+    from nanomsg.pool import SocketPool
+
+    pool = SocketPool(max_idle=64, idle_ttl=30)
+    with pool.connection(REQ, 'tcp://127.0.0.1:5555') as socket:
+        socket.send(b'ping')
+        reply = socket.recv()
+"""
+from __future__ import division, absolute_import, print_function, unicode_literals
+
+import contextlib
+import threading
+from collections import OrderedDict
+
+try:
+    from time import monotonic as _clock
+except ImportError:
+    from time import time as _clock  # py2
+
+from . import AF_SP, NanoMsgError, Socket
+
+
+def _options_key(options):
+    if not options:
+        return ()
+    return tuple(sorted(options.items(), key=lambda item: item[0]))
+
+
+class SocketPool(object):
+    """Cache of connected sockets keyed by (protocol, address, options).
+
+    options is a dict of (level, option) => value applied to new sockets
+    with Socket.set_options.
+
+    At most max_idle released sockets are kept, the least recently used are
+    closed first, and if idle_ttl (seconds) is not None sockets that have
+    been idle longer are closed.
+    """
+
+    def __init__(self, max_idle=64, idle_ttl=None, domain=AF_SP):
+        self._max_idle = max_idle
+        self._idle_ttl = idle_ttl
+        self._domain = domain
+        self._lock = threading.Lock()
+        # key => list of idle sockets, most recently released last
+        self._idle = {}
+        # id(socket) => (key, socket, release time), least recent first
+        self._lru = OrderedDict()
+        # id(socket) => key of the sockets handed out
+        self._checked_out = {}
+        self._closed = False
+
+    def __len__(self):
+        """Number of idle sockets"""
+        return len(self._lru)
+
+    def _evict(self, now):
+        """Remove expired and excess idle sockets, returns them to be closed
+        outside the lock"""
+        evicted = []
+        while self._lru:
+            socket_id, (key, socket, released) = next(iter(self._lru.items()))
+            expired = (self._idle_ttl is not None and
+                       now - released > self._idle_ttl)
+            if not expired and len(self._lru) <= self._max_idle:
+                break
+            del self._lru[socket_id]
+            sockets = self._idle[key]
+            sockets.remove(socket)
+            if not sockets:
+                del self._idle[key]
+            evicted.append(socket)
+        return evicted
+
+    def _new_socket(self, protocol, address, options):
+        socket = Socket(protocol, domain=self._domain)
+        try:
+            if options:
+                socket.set_options(
+                    [(level, option, value)
+                     for (level, option), value in options])
+            socket.connect(address)
+        except:
+            socket.close()
+            raise
+        return socket
+
+    def acquire(self, protocol, address, options=None):
+        """Returns a connected socket, reusing an idle one if possible.
+
+        The socket must be given back with release.
+        """
+        key = (protocol, address, _options_key(options))
+        socket = None
+        with self._lock:
+            if self._closed:
+                raise NanoMsgError('SocketPool is closed')
+            evicted = self._evict(_clock())
+            sockets = self._idle.get(key)
+            if sockets:
+                socket = sockets.pop()
+                if not sockets:
+                    del self._idle[key]
+                del self._lru[id(socket)]
+        for old in evicted:
+            old.close()
+        if socket is None:
+            socket = self._new_socket(protocol, address, key[2])
+        with self._lock:
+            self._checked_out[id(socket)] = key
+        return socket
+
+    def release(self, socket, discard=False):
+        """Give back a socket from acquire.
+
+        If discard is True, e.g. after an error left it in an unknown state,
+        the socket is closed instead of being kept for reuse.
+        """
+        with self._lock:
+            key = self._checked_out.pop(id(socket))
+            evicted = []
+            if discard or self._closed or not socket.is_open():
+                evicted.append(socket)
+            else:
+                now = _clock()
+                self._idle.setdefault(key, []).append(socket)
+                self._lru[id(socket)] = (key, socket, now)
+                evicted.extend(self._evict(now))
+        for old in evicted:
+            old.close()
+
+    @contextlib.contextmanager
+    def connection(self, protocol, address, options=None):
+        """Context manager acquiring a socket and releasing it on exit, the
+        socket is discarded if the block raises"""
+        socket = self.acquire(protocol, address, options)
+        try:
+            yield socket
+        except:
+            self.release(socket, discard=True)
+            raise
+        self.release(socket)
+
+    def close(self):
+        """Close the idle sockets, sockets still handed out are closed when
+        released"""
+        with self._lock:
+            self._closed = True
+            sockets = [socket for _, socket, _ in self._lru.values()]
+            self._idle.clear()
+            self._lru.clear()
+        for socket in sockets:
+            socket.close()
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *args):
+        self.close()
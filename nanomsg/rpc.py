@@ -0,0 +1,304 @@
+"""Concurrent request/reply over raw REQ/REP sockets.
+
+A Server recieves requests on a raw (AF_SP_RAW) REP socket, runs the handler
+for each one on an executor and sends every reply as soon as it is ready, so
+a slow request does not hold up the others. A Client pipelines requests over
+a raw REQ socket and returns futures e.g.:
+
+    from nanomsg.rpc import Client, Server
+
+    server = Server(lambda request: request.upper(), max_workers=8)
+    server.bind('tcp://127.0.0.1:5555')
+    server.start()
+
+    client = Client('tcp://127.0.0.1:5555')
+    futures = [client.call_async(b'hello %d' % i) for i in range(100)]
+    replies = [future.result() for future in futures]
+
+Requests and replies are bytes. Exceptions raised by the handler are sent
+back and raised by the client as RemoteError. A Server can also be used by
+plain REQ sockets, a reply then starts with a status byte (0 for success).
+"""
+from __future__ import division, absolute_import, print_function, unicode_literals
+
+import functools
+import random
+import struct
+import threading
+from concurrent.futures import Future, ThreadPoolExecutor
+from concurrent.futures import TimeoutError as FutureTimeoutError
+
+from . import (AF_SP_RAW, ETIMEDOUT, REP, REQ, NanoMsgAPIError, NanoMsgError,
+               Socket)
+from .codecs import _byte_view
+
+# values from nn.h
+_PROTO_SP = 1
+_SP_HDR = 1
+
+# struct nn_cmsghdr
+_CMSG_HEADER = struct.Struct(str('@Nii'))
+_SIZE_T = struct.Struct(str('@N'))
+_REQUEST_ID = struct.Struct(str('!I'))
+
+_OK = b'\x00'
+_ERROR = b'\x01'
+
+# recv timeout in ms, the longest it takes to notice stop or close
+_POLL_INTERVAL = 100
+
+
+class RemoteError(NanoMsgError):
+    """The server's handler raised an exception"""
+
+
+def _cmsg_align(length):
+    return (length + _SIZE_T.size - 1) & ~(_SIZE_T.size - 1)
+
+
+def _sp_header(control):
+    """Returns the SP_HDR routing header in control data from recvmsg"""
+    offset = 0
+    while control and offset + _CMSG_HEADER.size <= len(control):
+        length, level, kind = _CMSG_HEADER.unpack_from(control, offset)
+        if level == _PROTO_SP and kind == _SP_HDR:
+            start = offset + _cmsg_align(_CMSG_HEADER.size)
+            size, = _SIZE_T.unpack_from(control, start)
+            start += _SIZE_T.size
+            return control[start:start + size]
+        if length == 0:
+            break
+        offset += _cmsg_align(length)
+    return b''
+
+
+class Server(object):
+    """Serves handler(request) on a raw REP socket.
+
+    Each request is submitted to executor, a ThreadPoolExecutor with
+    max_workers threads by default. With a ProcessPoolExecutor the handler
+    must be picklable. handler gets the request as bytes and returns a bytes
+    like reply.
+    """
+
+    def __init__(self, handler, executor=None, max_workers=8):
+        self.handler = handler
+        self._owns_executor = executor is None
+        if executor is None:
+            executor = ThreadPoolExecutor(max_workers)
+        self._executor = executor
+        self.socket = Socket(REP, domain=AF_SP_RAW)
+        self.socket.recv_timeout = _POLL_INTERVAL
+        # notified when the last request in progress has been replied to
+        self._idle = threading.Condition()
+        self._in_progress = 0
+        self._running = False
+        self._thread = None
+        self.error = None
+
+    def bind(self, address):
+        return self.socket.bind(address)
+
+    def connect(self, address):
+        return self.socket.connect(address)
+
+    def serve_forever(self):
+        """Recieve and dispatch requests in the current thread until stop is
+        called"""
+        self._running = True
+        while self._running:
+            try:
+                message, control = self.socket.recvmsg()
+            except NanoMsgAPIError as e:
+                if e.errno == ETIMEDOUT:
+                    continue
+                if self._running:
+                    raise
+                break
+            request = memoryview(message).tobytes()
+            with self._idle:
+                self._in_progress += 1
+            try:
+                future = self._executor.submit(self.handler, request)
+            except:
+                with self._idle:
+                    self._in_progress -= 1
+                raise
+            future.add_done_callback(functools.partial(self._reply, control))
+
+    def _serve(self):
+        try:
+            self.serve_forever()
+        except NanoMsgError as e:
+            self.error = e
+
+    def start(self):
+        """Serve requests in a new daemon thread"""
+        self._running = True
+        self._thread = threading.Thread(target=self._serve,
+                                        name='nanomsg-rpc-server')
+        self._thread.daemon = True
+        self._thread.start()
+
+    def _reply(self, control, future):
+        try:
+            self._send_reply(control, future)
+        finally:
+            with self._idle:
+                self._in_progress -= 1
+                if not self._in_progress:
+                    self._idle.notify_all()
+
+    def _send_reply(self, control, future):
+        if future.cancelled():
+            return
+        error = future.exception()
+        if error is None:
+            status, reply = _OK, future.result()
+            if reply is None:
+                reply = b''
+            try:
+                memoryview(reply)
+            except TypeError as e:
+                error = e
+        if error is not None:
+            status = _ERROR
+            reply = ('%s: %s' % (type(error).__name__, error)).encode('utf-8')
+        try:
+            self.socket.sendmsg([status, reply], control=control)
+        except NanoMsgAPIError:
+            # the socket was closed, nanomsg drops replies to peers that went
+            # away by itself
+            pass
+
+    def stop(self, timeout=None):
+        """Stop recieving, wait for the requests in progress to be replied to
+        and close the socket"""
+        self._running = False
+        if self._thread is not None:
+            self._thread.join(timeout)
+        with self._idle:
+            if self._in_progress:
+                self._idle.wait(timeout)
+        if self._owns_executor:
+            self._executor.shutdown(wait=False)
+        self.socket.close()
+
+    close = stop
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *args):
+        self.stop()
+
+
+class Client(object):
+    """Pipelined requests over a raw REQ socket.
+
+    Any number of requests can be outstanding, replies are matched to their
+    request by id as they arrive in any order. Unlike a REQ socket requests
+    are not resent, pass a timeout to call or Future.result instead.
+    """
+
+    def __init__(self, address=None):
+        self.socket = Socket(REQ, domain=AF_SP_RAW)
+        self.socket.recv_timeout = _POLL_INTERVAL
+        self._lock = threading.Lock()
+        self._futures = {}
+        self._next_id = random.getrandbits(31)
+        self._running = True
+        self._thread = threading.Thread(target=self._receive,
+                                        name='nanomsg-rpc-client')
+        self._thread.daemon = True
+        self._thread.start()
+        if address is not None:
+            self.connect(address)
+
+    def connect(self, address):
+        return self.socket.connect(address)
+
+    def bind(self, address):
+        return self.socket.bind(address)
+
+    def __len__(self):
+        """Number of requests waiting for a reply"""
+        return len(self._futures)
+
+    def call_async(self, request):
+        """Send request, returns a Future of the reply"""
+        future = Future()
+        with self._lock:
+            if not self._running:
+                raise NanoMsgError('Client is closed')
+            request_id = self._next_id
+            self._next_id = (request_id + 1) & 0x7fffffff
+            self._futures[request_id] = future
+        try:
+            # the top bit marks the end of the routing header
+            self.socket.sendmsg([_REQUEST_ID.pack(request_id | 0x80000000),
+                                 request])
+        except:
+            with self._lock:
+                self._futures.pop(request_id, None)
+            raise
+        return future
+
+    def call(self, request, timeout=None):
+        """Send request and wait for the reply, timeout is in seconds"""
+        future = self.call_async(request)
+        try:
+            return future.result(timeout)
+        except FutureTimeoutError:
+            with self._lock:
+                for request_id, pending in list(self._futures.items()):
+                    if pending is future:
+                        del self._futures[request_id]
+            raise
+
+    def _receive(self):
+        error = NanoMsgError('Client is closed')
+        while self._running:
+            try:
+                message, control = self.socket.recvmsg()
+            except NanoMsgAPIError as e:
+                if e.errno == ETIMEDOUT:
+                    continue
+                error = e
+                break
+            header = _sp_header(control)
+            if len(header) < _REQUEST_ID.size:
+                continue
+            request_id = _REQUEST_ID.unpack_from(
+                header, len(header) - _REQUEST_ID.size)[0] & 0x7fffffff
+            with self._lock:
+                future = self._futures.pop(request_id, None)
+            if future is None:
+                # abandoned after a timeout
+                continue
+            view = _byte_view(message)
+            status = view[:1].tobytes()
+            if status == _OK:
+                future.set_result(view[1:].tobytes())
+            elif status == _ERROR:
+                future.set_exception(RemoteError(
+                    view[1:].tobytes().decode('utf-8', 'replace')))
+            else:
+                future.set_exception(NanoMsgError('Invalid reply'))
+        with self._lock:
+            self._running = False
+            futures, self._futures = list(self._futures.values()), {}
+        for future in futures:
+            future.set_exception(error)
+
+    def close(self):
+        """Close the socket, requests waiting for a reply fail"""
+        self._running = False
+        self._thread.join()
+        self.socket.close()
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *args):
+        self.close()
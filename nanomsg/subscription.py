@@ -0,0 +1,294 @@
+"""Topic routing for SUB sockets.
+
+A SubscriptionDispatcher owns a SUB socket, subscribes it to the topics of
+the registered handlers and routes each message to the handlers whose topic
+is a prefix of it. Handlers are found with a byte trie so the cost does not
+depend on the number of topics e.g.:
+
+    from nanomsg.subscription import SubscriptionDispatcher
+
+    dispatcher = SubscriptionDispatcher()
+    dispatcher.socket.connect('tcp://127.0.0.1:5555')
+    dispatcher.subscribe(b'prices.', on_price)
+    dispatcher.subscribe(b'prices.EUR', on_euro_price)
+    while True:
+        dispatcher.dispatch_batch()
+
+A ConflatingSubscriber instead keeps only the newest message per topic, so a
+consumer that falls behind skips stale updates rather than working through
+a backlog.
+"""
+from __future__ import division, absolute_import, print_function, unicode_literals
+
+from . import (DONTWAIT, SUB, SUB_SUBSCRIBE, SUB_UNSUBSCRIBE, Socket,
+               _nn_check_positive_rtn, wrapper)
+
+_unicode = type('')
+
+
+def _topic_bytes(topic):
+    if isinstance(topic, _unicode):
+        return topic.encode('utf-8')
+    return bytes(topic)
+
+
+class _Node(object):
+    __slots__ = ('children', 'values')
+
+    def __init__(self):
+        self.children = {}
+        self.values = None
+
+
+class _PrefixTrie(object):
+    """Maps byte string topics to lists of values, looked up by the topics
+    that are prefixes of a message"""
+
+    def __init__(self):
+        self._root = _Node()
+        # no topic is longer, messages are only walked this far
+        self._depth = 0
+        self._topics = {}
+
+    def __len__(self):
+        return len(self._topics)
+
+    def __contains__(self, topic):
+        return topic in self._topics
+
+    def topics(self):
+        return list(self._topics)
+
+    def values(self, topic):
+        return list(self._topics[topic].values)
+
+    def add(self, topic, value):
+        """Add value to topic, returns True if the topic is new"""
+        node = self._root
+        for byte in bytearray(topic):
+            child = node.children.get(byte)
+            if child is None:
+                child = node.children[byte] = _Node()
+            node = child
+        new = node.values is None
+        if new:
+            node.values = []
+            self._topics[topic] = node
+            self._depth = max(self._depth, len(topic))
+        node.values.append(value)
+        return new
+
+    def remove(self, topic, value=None):
+        """Remove value from topic, or every value if it is None. Returns
+        True if the topic has no values left"""
+        node = self._topics.get(topic)
+        if node is None:
+            raise KeyError(topic)
+        if value is not None:
+            node.values.remove(value)
+            if node.values:
+                return False
+        node.values = None
+        del self._topics[topic]
+        self._prune(topic)
+        self._depth = max([len(t) for t in self._topics] or [0])
+        return True
+
+    def _prune(self, topic):
+        """Remove the nodes left without values or children"""
+        key = bytearray(topic)
+        path = [self._root]
+        for byte in key:
+            path.append(path[-1].children[byte])
+        for i in range(len(key), 0, -1):
+            if path[i].children or path[i].values is not None:
+                break
+            del path[i - 1].children[key[i - 1]]
+
+    def match_all(self, message):
+        """Returns [(topic length, values)] for every topic that is a prefix
+        of message, shortest first"""
+        node = self._root
+        matches = []
+        if node.values:
+            matches.append((0, node.values))
+        depth = 0
+        for byte in bytearray(message[:self._depth]):
+            node = node.children.get(byte)
+            if node is None:
+                break
+            depth += 1
+            if node.values:
+                matches.append((depth, node.values))
+        return matches
+
+    def match_longest(self, message):
+        """Returns (topic length, values) of the longest topic that is a
+        prefix of message, or None"""
+        matches = self.match_all(message)
+        if not matches:
+            return None
+        return matches[-1]
+
+
+class SubscriptionDispatcher(object):
+    """Routes messages recieved on a SUB socket to handlers by topic.
+
+    With mode 'all' every handler whose topic is a prefix of the message is
+    called, shortest topic first. With mode 'longest' only the handlers of
+    the longest matching topic are. Handlers are called with the message
+    as bytes.
+
+    socket is the SUB socket to use, a new one is created by default. It is
+    drained in batches of up to batch_size messages.
+    """
+
+    def __init__(self, socket=None, mode='all', batch_size=256):
+        if mode not in ('all', 'longest'):
+            raise ValueError("mode must be 'all' or 'longest'")
+        self.socket = Socket(SUB) if socket is None else socket
+        self.mode = mode
+        self.batch_size = batch_size
+        self._trie = _PrefixTrie()
+
+    @property
+    def topics(self):
+        """The subscribed topics"""
+        return self._trie.topics()
+
+    def subscribe(self, topic, handler):
+        """Call handler for messages starting with topic, the socket is
+        subscribed to topic if it is new"""
+        topic = _topic_bytes(topic)
+        if topic not in self._trie:
+            self.socket.set_string_option(SUB, SUB_SUBSCRIBE, topic)
+        self._trie.add(topic, handler)
+
+    def unsubscribe(self, topic, handler=None):
+        """Remove handler, or all handlers if None, from topic. The socket is
+        unsubscribed from topic when it has no handlers left"""
+        topic = _topic_bytes(topic)
+        if topic not in self._trie:
+            raise KeyError(topic)
+        if handler is None or self._trie.values(topic) == [handler]:
+            self.socket.set_string_option(SUB, SUB_UNSUBSCRIBE, topic)
+        self._trie.remove(topic, handler)
+
+    def handlers(self, message):
+        """Returns the handlers message would be dispatched to"""
+        if self.mode == 'all':
+            return [handler for _, handlers in self._trie.match_all(message)
+                    for handler in handlers]
+        match = self._trie.match_longest(message)
+        return [] if match is None else list(match[1])
+
+    def dispatch(self, message):
+        """Call the handlers of message, returns how many were called"""
+        handlers = self.handlers(message)
+        for handler in handlers:
+            handler(message)
+        return len(handlers)
+
+    def dispatch_batch(self, flags=0):
+        """Recieve the queued messages, up to batch_size, and dispatch them.
+
+        Only waiting for the first message honours flags (e.g. blocks), the
+        rest are drained with DONTWAIT. Returns the number of messages.
+        """
+        messages = self.socket.recv_many(self.batch_size, flags)
+        for message in messages:
+            self.dispatch(message)
+        return len(messages)
+
+    def close(self):
+        self.socket.close()
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *args):
+        self.close()
+
+
+class ConflatingSubscriber(object):
+    """Latest value only SUB socket.
+
+    poll drains every queued message and returns the newest one per key. By
+    default the key of a message is the longest subscribed topic it starts
+    with, key can be a function called with a memoryview of the message
+    returning the key instead. Stale messages are dropped without being
+    copied.
+
+    socket is the SUB socket to use, a new one is created by default.
+    received and dropped count the messages received and the stale ones
+    dropped.
+    """
+
+    def __init__(self, socket=None, key=None, batch_size=1024):
+        self.socket = Socket(SUB) if socket is None else socket
+        self.batch_size = batch_size
+        self._key = key
+        self._trie = _PrefixTrie()
+        self.received = 0
+        self.dropped = 0
+
+    @property
+    def topics(self):
+        """The subscribed topics"""
+        return self._trie.topics()
+
+    def subscribe(self, topic):
+        topic = _topic_bytes(topic)
+        if topic not in self._trie:
+            self.socket.set_string_option(SUB, SUB_SUBSCRIBE, topic)
+            self._trie.add(topic, topic)
+
+    def unsubscribe(self, topic):
+        topic = _topic_bytes(topic)
+        if topic not in self._trie:
+            raise KeyError(topic)
+        self.socket.set_string_option(SUB, SUB_UNSUBSCRIBE, topic)
+        self._trie.remove(topic)
+
+    def _message_key(self, view):
+        if self._key is not None:
+            return self._key(view)
+        match = self._trie.match_longest(view)
+        if match is None:
+            return b''
+        return view[:match[0]].tobytes()
+
+    def poll(self, flags=0):
+        """Returns a dict of key => newest message (bytes) of the queued
+        messages.
+
+        Only waiting for the first message honours flags (e.g. blocks), the
+        queue is then drained batch_size messages at a time with DONTWAIT.
+        """
+        fd = self.socket.fd
+        rtn, messages = wrapper.nn_recv_many(fd, self.batch_size, flags)
+        if not messages:
+            _nn_check_positive_rtn(rtn)
+        latest = {}
+        count = 0
+        while messages:
+            count += len(messages)
+            for message in messages:
+                view = memoryview(message)
+                latest[self._message_key(view)] = view
+            if len(messages) < self.batch_size:
+                break
+            rtn, messages = wrapper.nn_recv_many(fd, self.batch_size,
+                                                 DONTWAIT)
+        self.received += count
+        self.dropped += count - len(latest)
+        return dict((key, view.tobytes()) for key, view in latest.items())
+
+    def close(self):
+        self.socket.close()
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *args):
+        self.close()
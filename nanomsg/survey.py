@@ -0,0 +1,71 @@
+"""Scatter-gather with SURVEYOR sockets.
+
+Surveyor.survey sends a survey and collects the responses until the deadline
+expires or enough respondents have answered e.g.:
+
+    from nanomsg.survey import Surveyor
+
+    with Surveyor() as surveyor:
+        surveyor.bind('tcp://127.0.0.1:5555')
+        replies = surveyor.survey(b'health?', deadline=0.5, min_responses=3)
+
+Responses are recieved in batches by the wrapper without raising an
+exception per message or on the deadline. See nanomsg.asyncio.AsyncSurveyor
+for the asyncio version.
+"""
+from __future__ import division, absolute_import, print_function, unicode_literals
+
+from . import (AF_SP, EFSM, ETIMEDOUT, SURVEYOR, SURVEYOR_DEADLINE, Socket,
+               _nn_check_positive_rtn, wrapper)
+
+# nn_recv errors meaning the survey is over
+_SURVEY_ENDED = (ETIMEDOUT, EFSM)
+
+
+def _responses(messages, copy):
+    if copy:
+        return [memoryview(message).tobytes() for message in messages]
+    return messages
+
+
+class Surveyor(Socket):
+    """SURVEYOR socket with a survey method.
+
+    Responses are recieved batch_size at a time.
+    """
+
+    batch_size = 256
+    _deadline_ms = None
+
+    def __init__(self, socket_fd=None, domain=AF_SP, **kwargs):
+        Socket.__init__(self, SURVEYOR if socket_fd is None else None,
+                        socket_fd, domain, **kwargs)
+
+    def _set_deadline(self, deadline):
+        """Set the SURVEYOR_DEADLINE option from seconds, unless unchanged"""
+        if deadline is None:
+            return
+        deadline_ms = max(1, int(deadline*1000))
+        if deadline_ms != self._deadline_ms:
+            self.set_int_option(SURVEYOR, SURVEYOR_DEADLINE, deadline_ms)
+            self._deadline_ms = deadline_ms
+
+    def survey(self, payload, deadline=None, min_responses=None, copy=True):
+        """Send payload as a survey and return the list of responses.
+
+        Responses are collected until deadline (seconds, the socket's
+        SURVEYOR_DEADLINE option if None) expires or, if min_responses is
+        not None, at least that many have arrived. See Socket.recv for the
+        meaning of copy.
+        """
+        self._set_deadline(deadline)
+        self.send(payload)
+        responses = []
+        while min_responses is None or len(responses) < min_responses:
+            rtn, messages = wrapper.nn_recv_many(self.fd, self.batch_size, 0)
+            if not messages:
+                if wrapper.nn_errno() in _SURVEY_ENDED:
+                    break
+                _nn_check_positive_rtn(rtn)
+            responses.extend(messages)
+        return _responses(responses, copy)
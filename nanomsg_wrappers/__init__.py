@@ -1,16 +1,23 @@
 from __future__ import division, absolute_import, print_function, unicode_literals
 
-from platform import python_implementation
-import pkgutil
 import importlib
-import warnings
+import sys
 
 _choice = None
+_instrumentation = False
 
 def set_wrapper_choice(name):
     global _choice
     _choice = name
 
+def set_instrumentation(enabled):
+    """Set whether new nanomsg Sockets record send/recv statistics"""
+    global _instrumentation
+    _instrumentation = bool(enabled)
+
+def get_instrumentation():
+    return _instrumentation
+
 def load_wrapper():
     if _choice is not None:
         return importlib.import_module('_nanomsg_' + _choice)
@@ -18,17 +25,29 @@ def load_wrapper():
     try:
         return importlib.import_module('_nanomsg_' + default)
     except ImportError:
+        import warnings
         warnings.warn(("Could not load the default wrapper for your platform: "
                        "%s, performance may be affected!") % (default,))
     return importlib.import_module('_nanomsg_ctypes')
 
+def _python_implementation():
+    # platform is slow to import, sys.implementation is py3.3+ only
+    if hasattr(sys, 'implementation'):
+        return sys.implementation.name
+    from platform import python_implementation
+    return python_implementation().lower()
+
 def get_default_for_platform():
-    if python_implementation() == 'CPython':
+    implementation = _python_implementation()
+    if implementation == 'cpython':
         return 'cpy'
+    elif implementation == 'pypy':
+        return 'cffi'
     else:
         return 'ctypes'
 
 
 def list_wrappers():
+    import pkgutil
     return [module_name.split('_',2)[-1] for _, module_name, _ in
      pkgutil.iter_modules() if module_name.startswith('_nanomsg_')]
@@ -4,6 +4,7 @@ import os
 import platform
 import sys
 from setuptools import setup
+from setuptools.command.build_py import build_py
 from distutils.core import Extension
 from distutils.command.build_ext import build_ext
 
@@ -47,6 +48,61 @@ cpy_extension = Extension(str('_nanomsg_cpy'),
                     libraries=libraries,
                     include_dirs=include_dirs,
                     )
+
+
+def nn_symbols():
+    """Returns the (name, value) pairs of nn_symbol from the installed
+    libnanomsg, or None if it can not be loaded"""
+    import ctypes
+    try:
+        if sys.platform in ('win32', 'cygwin'):
+            lib = ctypes.windll.nanomsg
+        elif sys.platform == 'darwin':
+            lib = ctypes.cdll.LoadLibrary('libnanomsg.dylib')
+        else:
+            lib = ctypes.cdll.LoadLibrary('libnanomsg.so')
+    except OSError:
+        return None
+    nn_symbol = lib.nn_symbol
+    nn_symbol.restype = ctypes.c_char_p
+    nn_symbol.argtypes = (ctypes.c_int, ctypes.POINTER(ctypes.c_int))
+    value = ctypes.c_int()
+    symbols = []
+    while True:
+        name = nn_symbol(len(symbols), ctypes.byref(value))
+        if name is None:
+            return symbols
+        symbols.append((name.decode('ascii'), value.value))
+
+
+class build_py_with_symbols(build_py):
+    """Also writes nanomsg/_symbols.py with the nanomsg constants so they
+    are not queried one at a time on import"""
+
+    def run(self):
+        build_py.run(self)
+        symbols = nn_symbols()
+        if symbols is None:
+            # nanomsg queries the library on import instead
+            return
+        path = os.path.join(self.build_lib, 'nanomsg', '_symbols.py')
+        with open(path, 'w') as f:
+            f.write('# Generated by setup.py from nn_symbol, do not edit\n')
+            f.write('SYMBOLS = [\n')
+            for name, value in symbols:
+                f.write("    ('%s', %d),\n" % (name, value))
+            f.write(']\n')
+
+
+try:
+    import cffi
+except ImportError:
+    # _nanomsg_cffi falls back to ABI mode if cffi is installed later
+    cffi_options = {}
+else:
+    cffi_options = {'cffi_modules': [str('_nanomsg_cffi/_build.py:ffibuilder')]}
+
+
 install_requires = []
 
 try:
@@ -58,9 +114,12 @@ except ImportError:
 setup(
     name='nanomsg',
     version=__version__,
-    packages=[str('nanomsg'), str('_nanomsg_ctypes'), str('nanomsg_wrappers')],
+    packages=[str('nanomsg'), str('_nanomsg_ctypes'), str('_nanomsg_cffi'),
+              str('nanomsg_wrappers')],
     ext_modules=[cpy_extension],
+    cmdclass={'build_py': build_py_with_symbols},
     install_requires=install_requires,
+    extras_require={'cffi': ['cffi>=1.12']},
     description='Python library for nanomsg.',
     classifiers=[
         "Development Status :: 3 - Alpha",
@@ -79,4 +138,5 @@ setup(
     keywords=['nanomsg', 'driver'],
     license='MIT',
     test_suite="tests",
+    **cffi_options
 )
@@ -0,0 +1,368 @@
+"""Benchmark the nanomsg python bindings.
+
+Measures messages/second, MB/second and p50/p99/p999 latency for every
+protocol over inproc, ipc and tcp (localhost) for a range of message sizes
+with each available wrapper (each wrapper runs in its own process).
+
+Request/reply style protocols (pair, reqrep, survey, bus) are measured with
+a ping-pong so latency is the round trip time, one way protocols (pipeline,
+pubsub) embed a send timestamp in the message so latency is the time from
+send to receive including any queueing.
+
+e.g.:
+    python test_utils/benchmark.py --protocol pair reqrep --size 16 1024 \\
+        --json results.json
+    python test_utils/benchmark.py --baseline results.json
+
+The exit status is 1 if --baseline is given and a result regressed by more
+than --tolerance.
+"""
+from __future__ import division, absolute_import, print_function,\
+ unicode_literals
+import argparse
+import json
+import os
+import struct
+import subprocess
+import sys
+import tempfile
+import threading
+import time
+
+sys.path.insert(0, os.path.join(os.path.dirname(os.path.abspath(__file__)),
+                                os.pardir))
+
+from nanomsg_wrappers import set_wrapper_choice, list_wrappers
+
+try:
+    from time import perf_counter as timer
+except ImportError:
+    from time import time as timer  # py2
+
+PROTOCOLS = ['pair', 'reqrep', 'survey', 'bus', 'pipeline', 'pubsub']
+TRANSPORTS = ['inproc', 'ipc', 'tcp']
+SIZES = [16, 256, 4096, 64*1024, 1024*1024, 16*1024*1024]
+TIMESTAMP = struct.Struct(str('d'))
+TCP_BASE_PORT = 45300
+# milliseconds to wait for a reply, a lost one fails the case
+REPLY_TIMEOUT = 10000
+
+_address_count = [0]
+
+
+def make_address(transport):
+    _address_count[0] += 1
+    n = _address_count[0]
+    if transport == 'inproc':
+        return 'inproc://benchmark-%d' % (n,)
+    if transport == 'ipc':
+        return 'ipc://%s' % (os.path.join(
+            tempfile.gettempdir(),
+            'nanomsg-benchmark-%d-%d.ipc' % (os.getpid(), n)),)
+    return 'tcp://127.0.0.1:%d' % (TCP_BASE_PORT + n,)
+
+
+class Result(object):
+    def __init__(self, size):
+        from nanomsg.instrumentation import Histogram
+        self.size = size
+        self.messages = 0
+        self.elapsed = 0.0
+        self.latency_ns = Histogram()
+        self._lock = threading.Lock()
+
+    def record_latency(self, seconds):
+        with self._lock:
+            self.latency_ns.record(max(0, int(seconds*1e9)))
+
+    def as_dict(self):
+        elapsed = self.elapsed or float('nan')
+        return {
+            'size': self.size,
+            'messages': self.messages,
+            'msgs_per_sec': self.messages/elapsed,
+            'mb_per_sec': self.messages*self.size/elapsed/(1024*1024),
+            'p50_us': self.latency_ns.percentile(50)/1000.0,
+            'p99_us': self.latency_ns.percentile(99)/1000.0,
+            'p999_us': self.latency_ns.percentile(99.9)/1000.0,
+        }
+
+
+class Echo(threading.Thread):
+    """Replies to every message recieved on the socket until stopped"""
+
+    def __init__(self, socket, copy):
+        threading.Thread.__init__(self)
+        self.daemon = True
+        self.socket = socket
+        self.copy = copy
+        self.running = True
+        socket.recv_timeout = 100
+
+    def run(self):
+        from nanomsg import NanoMsgAPIError
+        while self.running:
+            try:
+                msg = self.socket.recv(copy=self.copy)
+            except NanoMsgAPIError:
+                continue
+            try:
+                self.socket.send(msg)
+            except NanoMsgAPIError:
+                pass
+
+    def stop(self):
+        self.running = False
+        self.join()
+        self.socket.close()
+
+
+def ping_pong(nanomsg, requester, repliers, size, duration, copy,
+              replies=1):
+    msg = nanomsg.create_writable_buffer(size)
+    requester.recv_timeout = REPLY_TIMEOUT
+    echoes = [Echo(socket, copy) for socket in repliers]
+    for echo in echoes:
+        echo.start()
+    try:
+        time.sleep(0.2)  # let asynchronous connects complete
+        result = Result(size)
+        start = timer()
+        end = start + duration
+        now = start
+        while now < end:
+            requester.send(msg)
+            for i in range(replies):
+                requester.recv(copy=copy)
+            then, now = now, timer()
+            result.record_latency(now - then)
+            result.messages += 1
+        result.elapsed = now - start
+    finally:
+        for echo in echoes:
+            echo.stop()
+    return result
+
+
+def one_way(nanomsg, sender, receivers, size, duration, copy):
+    msg = nanomsg.create_writable_buffer(size)
+    view = memoryview(msg)
+    result = Result(size)
+    sending = [True]
+    counts = [0]*len(receivers)
+    times = [[None, None] for _ in receivers]
+
+    def receive(n, socket):
+        socket.recv_timeout = 200
+        while True:
+            try:
+                received = socket.recv(copy=copy)
+            except nanomsg.NanoMsgAPIError:
+                if sending[0]:
+                    continue
+                break
+            now = timer()
+            if times[n][0] is None:
+                times[n][0] = now
+            times[n][1] = now
+            counts[n] += 1
+            if size >= TIMESTAMP.size:
+                sent = TIMESTAMP.unpack_from(memoryview(received))[0]
+                result.record_latency(now - sent)
+
+    threads = [threading.Thread(target=receive, args=(n, socket))
+               for n, socket in enumerate(receivers)]
+    for thread in threads:
+        thread.daemon = True
+        thread.start()
+    time.sleep(0.2)  # let asynchronous connects complete
+    end = timer() + duration
+    while timer() < end:
+        if size >= TIMESTAMP.size:
+            TIMESTAMP.pack_into(view, 0, timer())
+        sender.send(msg)
+    sending[0] = False
+    for thread in threads:
+        thread.join()
+    result.messages = sum(counts)
+    starts = [t[0] for t in times if t[0] is not None]
+    ends = [t[1] for t in times if t[1] is not None]
+    if starts:
+        result.elapsed = max(ends) - min(starts)
+    return result
+
+
+def run_case(nanomsg, protocol, transport, size, duration, copy,
+             peers=4):
+    Socket = nanomsg.Socket
+    address = make_address(transport)
+    sockets = []
+
+    def socket(protocol_id):
+        s = Socket(protocol_id)
+        sockets.append(s)
+        # the default limit (1MB) drops larger messages over ipc and tcp
+        s.set_int_option(nanomsg.SOL_SOCKET, nanomsg.RCVMAXSIZE, -1)
+        return s
+
+    try:
+        if protocol == 'pair':
+            a, b = socket(nanomsg.PAIR), socket(nanomsg.PAIR)
+            a.bind(address)
+            b.connect(address)
+            return ping_pong(nanomsg, a, [b], size, duration, copy)
+        if protocol == 'reqrep':
+            rep, req = socket(nanomsg.REP), socket(nanomsg.REQ)
+            rep.bind(address)
+            req.connect(address)
+            return ping_pong(nanomsg, req, [rep], size, duration, copy)
+        if protocol == 'bus':
+            a, b = socket(nanomsg.BUS), socket(nanomsg.BUS)
+            a.bind(address)
+            b.connect(address)
+            return ping_pong(nanomsg, a, [b], size, duration, copy)
+        if protocol == 'survey':
+            surveyor = socket(nanomsg.SURVEYOR)
+            surveyor.bind(address)
+            surveyor.set_int_option(nanomsg.SURVEYOR,
+                                    nanomsg.SURVEYOR_DEADLINE, 5000)
+            respondents = [socket(nanomsg.RESPONDENT) for i in range(peers)]
+            for respondent in respondents:
+                respondent.connect(address)
+            return ping_pong(nanomsg, surveyor, respondents, size, duration,
+                             copy, replies=peers)
+        if protocol == 'pipeline':
+            push, pull = socket(nanomsg.PUSH), socket(nanomsg.PULL)
+            pull.bind(address)
+            push.connect(address)
+            return one_way(nanomsg, push, [pull], size, duration, copy)
+        if protocol == 'pubsub':
+            pub = socket(nanomsg.PUB)
+            pub.bind(address)
+            subs = [socket(nanomsg.SUB) for i in range(peers)]
+            for sub in subs:
+                sub.set_string_option(nanomsg.SUB, nanomsg.SUB_SUBSCRIBE, b'')
+                sub.connect(address)
+            return one_way(nanomsg, pub, subs, size, duration, copy)
+        raise ValueError('Unknown protocol %r' % (protocol,))
+    finally:
+        for s in sockets:
+            s.close()
+
+
+def run_wrapper(args):
+    set_wrapper_choice(args.wrapper[0])
+    import nanomsg
+    results = []
+    for protocol in args.protocol:
+        for transport in args.transport:
+            for size in args.size:
+                try:
+                    result = run_case(nanomsg, protocol, transport, size,
+                                      args.duration, not args.zero_copy,
+                                      args.peers).as_dict()
+                except nanomsg.NanoMsgAPIError as e:
+                    print('%-7s %-8s %-6s %9d B failed: %s' % (
+                        args.wrapper[0], protocol, transport, size, e))
+                    continue
+                result.update(wrapper=args.wrapper[0], protocol=protocol,
+                              transport=transport)
+                results.append(result)
+                print_result(result)
+                sys.stdout.flush()
+    return results
+
+
+def result_key(result):
+    return (result['wrapper'], result['protocol'], result['transport'],
+            result['size'])
+
+
+def print_result(result):
+    print(('%(wrapper)-7s %(protocol)-8s %(transport)-6s %(size)9d B '
+           '%(msgs_per_sec)12.1f msg/s %(mb_per_sec)10.2f MB/s '
+           'p50 %(p50_us)9.1f us p99 %(p99_us)9.1f us '
+           'p999 %(p999_us)9.1f us') % result)
+
+
+def compare(results, baseline, tolerance):
+    """Print and return the results that regressed against the baseline"""
+    baseline = dict((result_key(r), r) for r in baseline)
+    regressions = []
+    for result in results:
+        base = baseline.get(result_key(result))
+        if base is None:
+            continue
+        slower = result['msgs_per_sec'] < base['msgs_per_sec']*(1 - tolerance)
+        later = result['p99_us'] > base['p99_us']*(1 + tolerance)
+        if slower or later:
+            regressions.append(result)
+            print(('REGRESSION %s: %.1f msg/s (baseline %.1f), p99 %.1f us '
+                   '(baseline %.1f)') % (
+                       ' '.join(str(k) for k in result_key(result)),
+                       result['msgs_per_sec'], base['msgs_per_sec'],
+                       result['p99_us'], base['p99_us']))
+    return regressions
+
+
+def parse_args():
+    parser = argparse.ArgumentParser(description=__doc__.split('\n\n')[0])
+    parser.add_argument('--wrapper', nargs='+', default=sorted(list_wrappers()),
+                        help='wrappers to benchmark (default: all)')
+    parser.add_argument('--protocol', nargs='+', default=PROTOCOLS,
+                        choices=PROTOCOLS)
+    parser.add_argument('--transport', nargs='+', default=TRANSPORTS,
+                        choices=TRANSPORTS)
+    parser.add_argument('--size', nargs='+', type=int, default=SIZES,
+                        help='message sizes in bytes')
+    parser.add_argument('--duration', type=float, default=1.0,
+                        help='seconds per case')
+    parser.add_argument('--peers', type=int, default=4,
+                        help='number of respondents/subscribers')
+    parser.add_argument('--zero-copy', action='store_true',
+                        help='recieve with copy=False')
+    parser.add_argument('--json', help='write the results to this file')
+    parser.add_argument('--baseline', help='compare against this results file')
+    parser.add_argument('--tolerance', type=float, default=0.1,
+                        help='allowed relative regression (default 0.1)')
+    return parser.parse_args()
+
+
+def main():
+    args = parse_args()
+    if len(args.wrapper) == 1:
+        results = run_wrapper(args)
+    else:
+        results = []
+        for wrapper in args.wrapper:
+            fd, path = tempfile.mkstemp(suffix='.json')
+            os.close(fd)
+            try:
+                command = [sys.executable, os.path.abspath(__file__),
+                           '--wrapper', wrapper, '--json', path]
+                for name in ('protocol', 'transport', 'size'):
+                    command.append('--' + name)
+                    command.extend(str(v) for v in getattr(args, name))
+                command.extend(['--duration', str(args.duration),
+                                '--peers', str(args.peers)])
+                if args.zero_copy:
+                    command.append('--zero-copy')
+                if subprocess.call(command) != 0:
+                    print('Benchmarking wrapper %r failed' % (wrapper,))
+                    continue
+                with open(path) as f:
+                    results.extend(json.load(f))
+            finally:
+                os.remove(path)
+    if args.json:
+        with open(args.json, 'w') as f:
+            json.dump(results, f, indent=2)
+    if args.baseline:
+        with open(args.baseline) as f:
+            baseline = json.load(f)
+        if compare(results, baseline, args.tolerance):
+            sys.exit(1)
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,72 @@
+"""Measure how long `import nanomsg` takes with each available wrapper.
+
+Every sample imports nanomsg in a fresh interpreter, which times the import
+itself and reports it.
+
+e.g.:
+    python test_utils/import_time.py --repeat 20
+    python -X importtime -c "import nanomsg"
+"""
+from __future__ import division, absolute_import, print_function,\
+ unicode_literals
+import argparse
+import os
+import subprocess
+import sys
+
+ROOT = os.path.join(os.path.dirname(os.path.abspath(__file__)), os.pardir)
+sys.path.insert(0, ROOT)
+
+from nanomsg_wrappers import list_wrappers
+
+# run in a fresh interpreter started in ROOT, prints the seconds it takes
+# to choose the wrapper and import nanomsg
+_CHILD = """
+import sys
+try:
+    from time import perf_counter as timer
+except ImportError:
+    from time import time as timer
+start = timer()
+from nanomsg_wrappers import set_wrapper_choice
+set_wrapper_choice(sys.argv[1])
+import nanomsg
+print(repr(timer() - start))
+"""
+
+
+def sample(wrapper):
+    """Seconds it takes to import nanomsg in a child interpreter"""
+    command = [sys.executable, '-c', _CHILD, wrapper]
+    return float(subprocess.check_output(command, cwd=ROOT).decode('ascii'))
+
+
+def summary(samples):
+    samples = sorted(samples)
+    return samples[0], samples[len(samples)//2]
+
+
+def parse_args():
+    parser = argparse.ArgumentParser(description=__doc__.split('\n\n')[0])
+    parser.add_argument('--wrapper', nargs='+', default=sorted(list_wrappers()),
+                        help='wrappers to measure (default: all available)')
+    parser.add_argument('--repeat', type=int, default=10,
+                        help='imports per wrapper (default: 10)')
+    return parser.parse_args()
+
+
+def main():
+    args = parse_args()
+    print('%-10s %10s %10s' % ('wrapper', 'min ms', 'median ms'))
+    for wrapper in args.wrapper:
+        try:
+            samples = [sample(wrapper) for _ in range(args.repeat)]
+        except subprocess.CalledProcessError:
+            print('%-10s failed to import' % (wrapper,))
+            continue
+        fastest, median = summary(samples)
+        print('%-10s %10.1f %10.1f' % (wrapper, fastest*1000, median*1000))
+
+
+if __name__ == '__main__':
+    main()
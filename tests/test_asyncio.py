@@ -0,0 +1,124 @@
+import unittest
+import os
+import uuid
+
+from nanomsg_wrappers import set_wrapper_choice, get_default_for_platform
+set_wrapper_choice(os.environ.get('NANOMSG_PY_TEST_WRAPPER',
+                                  get_default_for_platform()))
+
+try:
+    import asyncio
+    from nanomsg.asyncio import AsyncSocket, AsyncSurveyor
+except (ImportError, SyntaxError):
+    asyncio = None
+
+from nanomsg import (
+    PAIR,
+    RESPONDENT,
+    Socket
+)
+
+SOCKET_ADDRESS = os.environ.get('NANOMSG_PY_TEST_ADDRESS',
+                                "inproc://{0}".format(uuid.uuid4()))
+
+
+@unittest.skipIf(asyncio is None, 'asyncio is not available')
+class TestAsyncSocket(unittest.TestCase):
+    def run_coroutine(self, coroutine):
+        loop = asyncio.new_event_loop()
+        try:
+            return loop.run_until_complete(
+                asyncio.wait_for(coroutine, 5))
+        finally:
+            loop.close()
+
+    def test_recv_waits_for_message(self):
+        async def exchange():
+            with AsyncSocket(PAIR) as s1:
+                with Socket(PAIR) as s2:
+                    s1.bind(SOCKET_ADDRESS)
+                    s2.connect(SOCKET_ADDRESS)
+                    loop = asyncio.get_event_loop()
+                    loop.call_later(0.05, s2.send, b'ABC')
+                    return await s1.recv()
+        self.assertEqual(b'ABC', self.run_coroutine(exchange()))
+
+    def test_send_recv(self):
+        async def exchange():
+            with AsyncSocket(PAIR) as s1:
+                with AsyncSocket(PAIR) as s2:
+                    s1.bind(SOCKET_ADDRESS)
+                    s2.connect(SOCKET_ADDRESS)
+                    received = asyncio.ensure_future(s1.recv())
+                    await s2.send(b'DEF')
+                    return await received
+        self.assertEqual(b'DEF', self.run_coroutine(exchange()))
+
+    def test_socket_arguments(self):
+        async def exchange():
+            with AsyncSocket(PAIR, codec='pickle', instrument=True) as s1:
+                with Socket(PAIR, codec='pickle') as s2:
+                    s1.bind(SOCKET_ADDRESS)
+                    s2.connect(SOCKET_ADDRESS)
+                    s2.send_obj({'a': 1})
+                    received = await s1.recv_obj()
+                    return received, s1.stats()['recv']['calls']
+        self.assertEqual(({'a': 1}, 1), self.run_coroutine(exchange()))
+
+    def test_send_stream_recv_stream(self):
+        async def exchange():
+            with AsyncSocket(PAIR) as s1:
+                with AsyncSocket(PAIR) as s2:
+                    s1.bind(SOCKET_ADDRESS)
+                    s2.connect(SOCKET_ADDRESS)
+                    sent = asyncio.ensure_future(
+                        s2.send_stream([b'AB', b'', b'CDE']))
+                    chunks = []
+                    async for chunk in s1.recv_stream():
+                        chunks.append(bytes(chunk))
+                    return await sent, chunks
+        self.assertEqual((5, [b'AB', b'CDE']), self.run_coroutine(exchange()))
+
+    def test_survey(self):
+        async def survey():
+            with AsyncSurveyor() as surveyor:
+                with Socket(RESPONDENT) as respondent:
+                    surveyor.bind(SOCKET_ADDRESS)
+                    respondent.connect(SOCKET_ADDRESS)
+                    loop = asyncio.get_event_loop()
+
+                    def respond():
+                        respondent.recv()
+                        respondent.send(b'pong')
+                    loop.call_later(0.05, respond)
+                    return await surveyor.survey(b'ping', deadline=0.5,
+                                                 min_responses=1)
+        self.assertEqual([b'pong'], self.run_coroutine(survey()))
+
+    def test_surveys_timing_out(self):
+        async def survey():
+            with AsyncSurveyor() as surveyor:
+                with Socket(RESPONDENT) as respondent:
+                    surveyor.bind(SOCKET_ADDRESS)
+                    respondent.connect(SOCKET_ADDRESS)
+                    timed_out = []
+                    for i in range(3):
+                        timed_out.append(await surveyor.survey(
+                            b'ping', deadline=0.05))
+                        respondent.recv()
+                    waiting = len(surveyor._recv_waiters._futures)
+                    loop = asyncio.get_event_loop()
+
+                    def respond():
+                        respondent.recv()
+                        respondent.send(b'pong')
+                    loop.call_later(0.05, respond)
+                    answered = await surveyor.survey(b'ping', deadline=0.5,
+                                                     min_responses=1)
+                    return timed_out, waiting, answered
+        self.assertEqual(([[], [], []], 0, [b'pong']),
+                         self.run_coroutine(survey()))
+
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,60 @@
+import unittest
+import os
+import uuid
+
+from nanomsg_wrappers import set_wrapper_choice, get_default_for_platform
+set_wrapper_choice(os.environ.get('NANOMSG_PY_TEST_WRAPPER',
+                                  get_default_for_platform()))
+
+from nanomsg import (
+    PAIR,
+    NanoMsgError,
+    Socket
+)
+from nanomsg.buffers import BufferPool
+
+SOCKET_ADDRESS = os.environ.get('NANOMSG_PY_TEST_ADDRESS',
+                                "inproc://{0}".format(uuid.uuid4()))
+
+
+class TestBufferPool(unittest.TestCase):
+    def test_recv_into_pool(self):
+        for use_mmap in (False, True):
+            pool = BufferPool(16, 2, use_mmap=use_mmap)
+            with Socket(PAIR) as s1:
+                with Socket(PAIR) as s2:
+                    s1.bind(SOCKET_ADDRESS)
+                    s2.connect(SOCKET_ADDRESS)
+
+                    s2.send(b'ABC')
+                    with s1.recv_into(pool) as lease:
+                        self.assertEqual(1, pool.available)
+                        self.assertEqual(b'ABC', lease.tobytes())
+                        self.assertFalse(lease.truncated)
+            self.assertEqual(2, pool.available)
+
+    def test_truncated_message(self):
+        pool = BufferPool(4, 1)
+        with Socket(PAIR) as s1:
+            with Socket(PAIR) as s2:
+                s1.bind(SOCKET_ADDRESS)
+                s2.connect(SOCKET_ADDRESS)
+
+                s2.send(b'ABCDEF')
+                lease = s1.recv_into(pool)
+        self.assertTrue(lease.truncated)
+        self.assertEqual(6, lease.message_size)
+        self.assertEqual(b'ABCD', lease.tobytes())
+        lease.release()
+
+    def test_exhausted_pool(self):
+        pool = BufferPool(4, 1)
+        lease = pool.acquire()
+        self.assertRaises(NanoMsgError, pool.acquire)
+        lease.release()
+        self.assertRaises(ValueError, lambda: lease.view)
+        pool.acquire().release()
+
+
+if __name__ == '__main__':
+    unittest.main()
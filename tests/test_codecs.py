@@ -0,0 +1,99 @@
+import pickle
+import unittest
+import os
+import uuid
+
+from nanomsg_wrappers import set_wrapper_choice, get_default_for_platform
+set_wrapper_choice(os.environ.get('NANOMSG_PY_TEST_WRAPPER',
+                                  get_default_for_platform()))
+
+from nanomsg import (
+    PAIR,
+    NanoMsgError,
+    Socket
+)
+from nanomsg.codecs import PickleCodec, get_codec
+
+try:
+    import msgpack
+except ImportError:
+    msgpack = None
+
+try:
+    import numpy
+except ImportError:
+    numpy = None
+
+SOCKET_ADDRESS = os.environ.get('NANOMSG_PY_TEST_ADDRESS',
+                                "inproc://{0}".format(uuid.uuid4()))
+
+
+class TestCodecs(unittest.TestCase):
+    def round_trip(self, codec, obj):
+        with Socket(PAIR, codec=codec) as s1:
+            with Socket(PAIR, codec=codec) as s2:
+                s1.bind(SOCKET_ADDRESS)
+                s2.connect(SOCKET_ADDRESS)
+
+                s2.send_obj(obj)
+                return s1.recv_obj()
+
+    def test_raw(self):
+        self.assertEqual(b'ABC', self.round_trip('raw', b'ABC'))
+
+    def test_pickle(self):
+        obj = {'list': [1, 2.5, 'three'], 'bytes': b'\x00\x01'}
+        self.assertEqual(obj, self.round_trip('pickle', obj))
+
+    @unittest.skipIf(pickle.HIGHEST_PROTOCOL < 5, 'requires pickle protocol 5')
+    def test_pickle_out_of_band(self):
+        payload = bytearray(range(256))*64
+        buffers = PickleCodec().encode(pickle.PickleBuffer(payload))
+        self.assertIn(len(payload),
+                      [memoryview(buf).nbytes for buf in buffers])
+        recieved = self.round_trip('pickle', pickle.PickleBuffer(payload))
+        self.assertEqual(bytes(payload), bytes(memoryview(recieved)))
+
+    @unittest.skipIf(msgpack is None, 'msgpack is not installed')
+    def test_msgpack(self):
+        obj = {'list': [1, 2.5, 'three'], 'bytes': b'\x00\x01'}
+        self.assertEqual(obj, self.round_trip('msgpack', obj))
+
+    @unittest.skipIf(numpy is None, 'numpy is not installed')
+    def test_send_recv_array(self):
+        arrays = [
+            numpy.arange(12, dtype=numpy.float32).reshape(3, 4),
+            numpy.asfortranarray(numpy.arange(6.0).reshape(2, 3)),
+            numpy.arange(20)[::2],
+        ]
+        with Socket(PAIR) as s1:
+            with Socket(PAIR) as s2:
+                s1.bind(SOCKET_ADDRESS)
+                s2.connect(SOCKET_ADDRESS)
+
+                for array in arrays:
+                    s2.send_array(array)
+                    recieved = s1.recv_array()
+                    self.assertEqual(array.dtype, recieved.dtype)
+                    self.assertEqual(array.shape, recieved.shape)
+                    self.assertTrue(numpy.array_equal(array, recieved))
+                    self.assertFalse(recieved.flags.owndata)
+
+    def test_default_codec_does_not_unpickle(self):
+        payload = pickle.dumps({'a': 1})
+        with Socket(PAIR) as s1:
+            with Socket(PAIR) as s2:
+                s1.bind(SOCKET_ADDRESS)
+                s2.connect(SOCKET_ADDRESS)
+
+                s2.send_obj(payload)
+                recieved = s1.recv_obj()
+                self.assertEqual('raw', s1.codec.name)
+        self.assertEqual(payload, recieved)
+
+    def test_unknown_codec(self):
+        self.assertRaises(NanoMsgError, get_codec, 'unknown')
+
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,51 @@
+import unittest
+import os
+import time
+import uuid
+
+from nanomsg_wrappers import set_wrapper_choice, get_default_for_platform
+set_wrapper_choice(os.environ.get('NANOMSG_PY_TEST_WRAPPER',
+                                  get_default_for_platform()))
+
+from nanomsg import (
+    AF_SP_RAW,
+    PAIR,
+    Device,
+    Socket
+)
+
+FRONT_ADDRESS = "inproc://{0}".format(uuid.uuid4())
+BACK_ADDRESS = "inproc://{0}".format(uuid.uuid4())
+
+
+class TestDevice(unittest.TestCase):
+    def test_background_device_forwards_and_stops(self):
+        front = Socket(PAIR, domain=AF_SP_RAW)
+        back = Socket(PAIR, domain=AF_SP_RAW)
+        front.bind(FRONT_ADDRESS)
+        back.bind(BACK_ADDRESS)
+        with Socket(PAIR) as client:
+            with Socket(PAIR) as server:
+                client.connect(FRONT_ADDRESS)
+                server.connect(BACK_ADDRESS)
+                device = Device(front, back).start_background()
+
+                client.send(b'ABC')
+                received = server.recv()
+                end = time.time() + 1
+                while device.messages_forwarded < 1 and time.time() < end:
+                    time.sleep(0.01)
+                forwarded = device.messages_forwarded
+                forwarded_bytes = device.bytes_forwarded
+
+                device.stop(1)
+        self.assertEqual(b'ABC', received)
+        self.assertEqual(1, forwarded)
+        self.assertEqual(3, forwarded_bytes)
+        self.assertFalse(device.is_alive())
+        self.assertEqual(None, device.error)
+        self.assertFalse(front.is_open())
+
+
+if __name__ == '__main__':
+    unittest.main()
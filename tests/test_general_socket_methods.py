@@ -5,11 +5,16 @@ from nanomsg_wrappers import set_wrapper_choice, get_default_for_platform
 set_wrapper_choice(os.environ.get('NANOMSG_PY_TEST_WRAPPER',
                                   get_default_for_platform()))
 
+import nanomsg
 from nanomsg import (
+    AF_SP,
     PAIR,
+    NanoMsgAPIError,
+    RCVBUF,
     Socket,
     SNDBUF,
-    SOL_SOCKET
+    SOL_SOCKET,
+    statistics_snapshot
 )
 
 SOCKET_ADDRESS = os.environ.get('NANOMSG_PY_TEST_ADDRESS', "inproc://a")
@@ -48,6 +53,58 @@ class TestGeneralSocketMethods(unittest.TestCase):
         actual = self.socket.get_int_option(SOL_SOCKET, SNDBUF)
         self.assertEqual(expected, actual)
 
+    def test_set_options(self):
+        self.socket.set_options({(SOL_SOCKET, SNDBUF): 4096,
+                                 (SOL_SOCKET, RCVBUF): 8192})
+
+        self.assertEqual(4096, self.socket.send_buffer_size)
+        self.assertEqual(8192, self.socket.recv_buffer_size)
+
+    def test_set_options_out_of_int_range(self):
+        self.assertRaises(OverflowError, self.socket.set_options,
+                          {(SOL_SOCKET, SNDBUF): 2**40})
+
+    def test_cached_options(self):
+        self.assertEqual(PAIR, self.socket.protocol)
+        self.assertEqual(AF_SP, self.socket.domain)
+        self.assertEqual(self.socket.recv_fd, self.socket.recv_fd)
+
+    def test_cached_options_cleared_on_close(self):
+        with Socket(PAIR) as socket:
+            socket.send_fd, socket.recv_fd, socket.protocol
+        with self.assertRaises(NanoMsgAPIError):
+            socket.send_fd
+        with self.assertRaises(NanoMsgAPIError):
+            socket.protocol
+
+    def test_statistics(self):
+        self.socket.bind(SOCKET_ADDRESS)
+        with Socket(PAIR) as other:
+            other.connect(SOCKET_ADDRESS)
+            other.send(b'ABC')
+            self.socket.recv()
+            stats = other.statistics()
+        self.assertEqual(1, stats['messages_sent'])
+        self.assertEqual(3, stats['bytes_sent'])
+
+    def test_statistics_snapshot(self):
+        snapshot = statistics_snapshot()
+
+        self.assertTrue(self.socket.fd in snapshot)
+        self.assertTrue('messages_received' in snapshot[self.socket.fd])
+
+    def test_statistics_snapshot_shared_fd(self):
+        # wrapping an fd again must not replace the original Socket
+        with Socket(PAIR) as first:
+            second = Socket(socket_fd=first.fd)
+            tracked = [socket for socket in nanomsg._open_sockets
+                       if socket.fd == first.fd]
+            snapshot = statistics_snapshot()
+
+            self.assertTrue(first in tracked)
+            self.assertTrue(second in tracked)
+            self.assertTrue(first.fd in snapshot)
+
 
 if __name__ == '__main__':
     unittest.main()
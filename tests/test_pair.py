@@ -1,12 +1,18 @@
 import unittest
+import io
 import os
+import shutil
+import tempfile
 
 from nanomsg_wrappers import set_wrapper_choice, get_default_for_platform
 set_wrapper_choice(os.environ.get('NANOMSG_PY_TEST_WRAPPER',
                                   get_default_for_platform()))
 
+import nanomsg
 from nanomsg import (
+    EAGAIN,
     PAIR,
+    NanoMsgAPIError,
     Socket
 )
 
@@ -25,6 +31,22 @@ class TestPairSockets(unittest.TestCase):
                 recieved = s1.recv()
         self.assertEqual(sent, recieved)
 
+    def test_try_send_try_recv(self):
+        with Socket(PAIR) as s1:
+            with Socket(PAIR) as s2:
+                self.assertFalse(s2.try_send(b'ABC'))
+                s1.bind(SOCKET_ADDRESS)
+                s2.connect(SOCKET_ADDRESS)
+
+                self.assertIsNone(s1.try_recv())
+                self.assertTrue(s2.try_send(b'ABC'))
+                self.assertEqual(b'ABC', s1.try_recv())
+
+    def test_api_error_message(self):
+        error = NanoMsgAPIError(EAGAIN)
+        self.assertEqual(EAGAIN, error.errno)
+        self.assertTrue(str(error))
+
     def test_send_recv_with_embeded_nulls(self):
         with Socket(PAIR) as s1:
             with Socket(PAIR) as s2:
@@ -47,6 +69,184 @@ class TestPairSockets(unittest.TestCase):
                 recieved = s1.recv()
         self.assertEqual(sent, recieved)
 
+    def test_send_recv_no_copy(self):
+        with Socket(PAIR) as s1:
+            with Socket(PAIR) as s2:
+                s1.bind(SOCKET_ADDRESS)
+                s2.connect(SOCKET_ADDRESS)
+
+                sent = b'ABC\x00DEF'
+                s2.send(sent)
+                recieved = s1.recv(copy=False)
+        self.assertEqual(len(sent), len(memoryview(recieved)))
+        self.assertEqual(sent, bytes(memoryview(recieved)))
+
+    def test_send_recv_no_copy_sizes(self):
+        with Socket(PAIR) as s1:
+            with Socket(PAIR) as s2:
+                s1.bind(SOCKET_ADDRESS)
+                s2.connect(SOCKET_ADDRESS)
+
+                for size in (0, 1, 63, 64, 65, 4096, 4097):
+                    sent = b'C'*size
+                    s2.send(sent)
+                    recieved = s1.recv(copy=False)
+                    self.assertEqual(size, len(memoryview(recieved)))
+                    self.assertEqual(sent, bytes(memoryview(recieved)))
+
+    def test_send_recv_sizes(self):
+        with Socket(PAIR) as s1:
+            with Socket(PAIR) as s2:
+                s1.bind(SOCKET_ADDRESS)
+                s2.connect(SOCKET_ADDRESS)
+
+                for size in (0, 1, 63, 64, 65, 4096, 4097, 5000):
+                    sent = b'D'*size
+                    s2.send(sent)
+                    self.assertEqual(sent, s1.recv())
+
+    def test_send_recv_into_buffer_no_copy(self):
+        with Socket(PAIR) as s1:
+            with Socket(PAIR) as s2:
+                s1.bind(SOCKET_ADDRESS)
+                s2.connect(SOCKET_ADDRESS)
+
+                sent = b'ABCDEF'
+                buf = bytearray(64)
+                s2.send(sent)
+                recieved = s1.recv(buf, copy=False)
+        self.assertEqual(sent, bytes(recieved))
+
+    def test_send_recv_releases_buffers(self):
+        # resizing raises BufferError while the wrapper still exports them,
+        # which on PyPy lasts until the next garbage collection
+        with Socket(PAIR) as s1:
+            with Socket(PAIR) as s2:
+                s1.bind(SOCKET_ADDRESS)
+                s2.connect(SOCKET_ADDRESS)
+
+                sent = bytearray(b'ABCDEF')
+                buf = bytearray(64)
+                s2.send(sent)
+                s1.recv(buf)
+                sent.extend(b'G')
+                buf.extend(b'H')
+        self.assertEqual(b'ABCDEF', bytes(buf[:6]))
+
+    def test_send_many_recv_many(self):
+        with Socket(PAIR) as s1:
+            with Socket(PAIR) as s2:
+                s1.bind(SOCKET_ADDRESS)
+                s2.connect(SOCKET_ADDRESS)
+
+                sent = [b'A', b'BC', b'DEF']
+                count = s2.send_many(sent)
+                recieved = []
+                while len(recieved) < len(sent):
+                    recieved.extend(s1.recv_many(10))
+        self.assertEqual(len(sent), count)
+        self.assertEqual(sent, recieved)
+
+    def test_sendmsg_recvmsg_into(self):
+        with Socket(PAIR) as s1:
+            with Socket(PAIR) as s2:
+                s1.bind(SOCKET_ADDRESS)
+                s2.connect(SOCKET_ADDRESS)
+
+                s2.sendmsg([b'HDR', bytearray(b'BODY')])
+                head, body = bytearray(3), bytearray(10)
+                size = s1.recvmsg_into([head, body])
+        self.assertEqual(7, size)
+        self.assertEqual(b'HDR', bytes(head))
+        self.assertEqual(b'BODY', bytes(body[:size - len(head)]))
+
+    def test_send_recv_stream(self):
+        with Socket(PAIR) as s1:
+            with Socket(PAIR) as s2:
+                s1.bind(SOCKET_ADDRESS)
+                s2.connect(SOCKET_ADDRESS)
+
+                sent = b'0123456789'
+                count = s2.send_stream(io.BytesIO(sent), chunk_size=4)
+                chunks = [bytes(chunk) for chunk in s1.recv_stream()]
+                s2.send_stream([b'AB', b'', b'CD'])
+                parts = [bytes(chunk) for chunk in s1.recv_stream()]
+        self.assertEqual(len(sent), count)
+        self.assertEqual([b'0123', b'4567', b'89'], chunks)
+        self.assertEqual([b'AB', b'CD'], parts)
+
+    def test_send_file_recv_file(self):
+        directory = tempfile.mkdtemp()
+        source = os.path.join(directory, 'source')
+        destination = os.path.join(directory, 'destination')
+        try:
+            with open(source, 'wb') as f:
+                f.write(b'0123456789')
+            with Socket(PAIR) as s1:
+                with Socket(PAIR) as s2:
+                    s1.bind(SOCKET_ADDRESS)
+                    s2.connect(SOCKET_ADDRESS)
+
+                    s2.send_file(source, offset=2, length=5)
+                    size = s1.recv_file(destination)
+                    s2.send_file(source)
+                    preallocated_size = s1.recv_file(destination, size=64)
+            with open(destination, 'rb') as f:
+                recieved = f.read()
+        finally:
+            shutil.rmtree(directory)
+        self.assertEqual(5, size)
+        self.assertEqual(10, preallocated_size)
+        self.assertEqual(b'0123456789', recieved)
+
+    def test_instrumented_send_recv(self):
+        with Socket(PAIR, instrument=True) as s1:
+            with Socket(PAIR, instrument=True) as s2:
+                s1.bind(SOCKET_ADDRESS)
+                s2.connect(SOCKET_ADDRESS)
+
+                s2.send(b'ABC')
+                s1.recv()
+                send_stats = s2.stats()['send']
+                recv_stats = s1.stats()['recv']
+                s1.reset_stats()
+                reset_stats = s1.stats()['recv']
+        self.assertEqual(1, send_stats['calls'])
+        self.assertEqual(3, send_stats['bytes'])
+        self.assertEqual(1, recv_stats['calls'])
+        self.assertEqual(3, recv_stats['size_bytes']['max'])
+        self.assertEqual(0, reset_stats['calls'])
+
+    def test_instrumented_send_overhead(self):
+        # a clock advancing about 1ms per reading, so the time after nn_send
+        # is only recorded as overhead if it is read separately
+        ticks = []
+
+        def clock():
+            ticks.append(None)
+            return len(ticks)/1024.0
+
+        timer = nanomsg._timer
+        nanomsg._timer = clock
+        try:
+            with Socket(PAIR, instrument=True) as s1:
+                with Socket(PAIR, instrument=True) as s2:
+                    s1.bind(SOCKET_ADDRESS)
+                    s2.connect(SOCKET_ADDRESS)
+
+                    s2.send(b'ABC')
+                    self.assertTrue(s2.try_send(b'DEF'))
+                    send_stats = s2.stats()['send']
+        finally:
+            nanomsg._timer = timer
+        self.assertEqual(2, send_stats['calls'])
+        self.assertGreater(send_stats['blocked_us']['min'], 0)
+        self.assertGreater(send_stats['overhead_us']['min'], 0)
+
+    def test_not_instrumented_by_default(self):
+        with Socket(PAIR) as s1:
+            self.assertEqual(None, s1.stats())
+
 
 
 
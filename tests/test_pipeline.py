@@ -0,0 +1,49 @@
+import unittest
+import os
+
+from nanomsg_wrappers import set_wrapper_choice, get_default_for_platform
+set_wrapper_choice(os.environ.get('NANOMSG_PY_TEST_WRAPPER',
+                                  get_default_for_platform()))
+
+from nanomsg.pipeline import Pipeline, PipelineError
+
+
+def double(value):
+    return value*2
+
+
+def add_one(value):
+    if value == 13:
+        raise ValueError('unlucky')
+    return value + 1
+
+
+class TestPipeline(unittest.TestCase):
+    def test_ordered(self):
+        with Pipeline([double, add_one], workers=2,
+                      max_in_flight=10) as pipeline:
+            results = list(pipeline.map(range(100)))
+            stats = pipeline.stats()
+        self.assertEqual([i*2 + 1 for i in range(100)], results)
+        self.assertEqual(['double', 'add_one'],
+                         [stage['name'] for stage in stats])
+        self.assertEqual([100, 100], [stage['items'] for stage in stats])
+
+    def test_unordered(self):
+        with Pipeline([(double, 3)], ordered=False) as pipeline:
+            results = list(pipeline.map(range(50)))
+        self.assertEqual(sorted(i*2 for i in range(50)), sorted(results))
+
+    def test_stage_error(self):
+        with Pipeline([add_one], workers=1) as pipeline:
+            results = pipeline.map([1, 13, 2])
+            self.assertEqual(2, next(results))
+            with self.assertRaises(PipelineError) as context:
+                next(results)
+            stats = pipeline.stats()
+        self.assertIn('unlucky', str(context.exception))
+        self.assertEqual(1, stats[0]['errors'])
+
+
+if __name__ == '__main__':
+    unittest.main()
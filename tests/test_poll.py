@@ -13,6 +13,9 @@ from nanomsg import (
     SOL_SOCKET,
     SNDBUF,
     poll,
+    Poller,
+    POLLIN,
+    POLLOUT,
     Socket,
     NanoMsgAPIError
 )
@@ -72,6 +75,51 @@ class TestPoll(unittest.TestCase):
                 self.assertEqual(0, len(r), "No sockets to read")
 
 
+class TestPoller(unittest.TestCase):
+    def test_read_poll(self):
+        with Socket(PAIR) as s1:
+            with Socket(PAIR) as s2:
+                s1.bind(SOCKET_ADDRESS)
+                s2.connect(SOCKET_ADDRESS)
+                poller = Poller()
+                poller.register(s1, POLLIN)
+                poller.register(s2, POLLIN)
+                self.assertEqual([], poller.poll(0),
+                                 "Precondition nothing to read")
+                s2.send(b'ABC')
+                ready = poller.poll(0)
+                self.assertEqual([(s1, POLLIN)], ready)
+                s1.recv()
+
+    def test_modify_and_unregister(self):
+        with Socket(PAIR) as s1:
+            with Socket(PAIR) as s2:
+                s1.bind(SOCKET_ADDRESS)
+                s2.connect(SOCKET_ADDRESS)
+                poller = Poller()
+                poller.register(s1, POLLIN)
+                poller.register(s2, POLLIN)
+                poller.modify(s2, POLLOUT)
+                self.assertEqual([(s2, POLLOUT)], poller.poll(1))
+                poller.unregister(s1)
+                self.assertEqual(1, len(poller))
+                self.assertEqual([(s2, POLLOUT)], poller.poll(1))
+                poller.unregister(s2)
+                self.assertEqual(0, len(poller))
+
+    def test_unregister_closed_socket(self):
+        with Socket(PAIR) as s1:
+            with Socket(PAIR) as s2:
+                s1.bind(SOCKET_ADDRESS)
+                s2.connect(SOCKET_ADDRESS)
+                poller = Poller()
+                poller.register(s1, POLLIN)
+                poller.register(s2, POLLOUT)
+                s1.close()
+                poller.unregister(s1)
+                self.assertEqual(1, len(poller))
+                self.assertEqual([(s2, POLLOUT)], poller.poll(1))
+
 
 if __name__ == '__main__':
     unittest.main()
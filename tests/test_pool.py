@@ -0,0 +1,95 @@
+import unittest
+import os
+import time
+import uuid
+
+from nanomsg_wrappers import set_wrapper_choice, get_default_for_platform
+set_wrapper_choice(os.environ.get('NANOMSG_PY_TEST_WRAPPER',
+                                  get_default_for_platform()))
+
+from nanomsg import (
+    REP,
+    REQ,
+    SNDBUF,
+    SOL_SOCKET,
+    Socket
+)
+from nanomsg.pool import SocketPool
+
+SOCKET_ADDRESS = os.environ.get('NANOMSG_PY_TEST_ADDRESS',
+                                "inproc://{0}".format(uuid.uuid4()))
+
+
+class TestSocketPool(unittest.TestCase):
+    def setUp(self):
+        self.server = Socket(REP)
+        self.server.bind(SOCKET_ADDRESS)
+        self.pool = SocketPool(max_idle=2)
+
+    def tearDown(self):
+        self.pool.close()
+        self.server.close()
+
+    def test_released_socket_is_reused(self):
+        with self.pool.connection(REQ, SOCKET_ADDRESS) as socket:
+            socket.send(b'ping')
+            self.server.send(self.server.recv())
+            self.assertEqual(b'ping', socket.recv())
+        with self.pool.connection(REQ, SOCKET_ADDRESS) as again:
+            self.assertTrue(again is socket)
+
+    def test_options_are_part_of_the_key(self):
+        options = {(SOL_SOCKET, SNDBUF): 256*1024}
+        socket = self.pool.acquire(REQ, SOCKET_ADDRESS, options)
+        self.assertEqual(256*1024, socket.get_int_option(SOL_SOCKET, SNDBUF))
+        self.pool.release(socket)
+        other = self.pool.acquire(REQ, SOCKET_ADDRESS)
+        self.assertFalse(other is socket)
+        self.pool.release(other)
+        self.assertTrue(self.pool.acquire(REQ, SOCKET_ADDRESS, options)
+                        is socket)
+
+    def test_least_recently_used_are_closed(self):
+        sockets = [self.pool.acquire(REQ, SOCKET_ADDRESS) for i in range(3)]
+        for socket in sockets:
+            self.pool.release(socket)
+        self.assertEqual(2, len(self.pool))
+        self.assertFalse(sockets[0].is_open())
+        self.assertTrue(sockets[2].is_open())
+
+    def test_idle_ttl(self):
+        pool = SocketPool(idle_ttl=0.01)
+        socket = pool.acquire(REQ, SOCKET_ADDRESS)
+        pool.release(socket)
+        time.sleep(0.05)
+        other = pool.acquire(REQ, SOCKET_ADDRESS)
+        self.assertFalse(socket.is_open())
+        pool.release(other)
+        pool.close()
+
+    def test_idle_ttl_ignores_wall_clock(self):
+        pool = SocketPool(idle_ttl=60)
+        socket = pool.acquire(REQ, SOCKET_ADDRESS)
+        pool.release(socket)
+        wall_clock = time.time
+        time.time = lambda: wall_clock() + 3600
+        try:
+            again = pool.acquire(REQ, SOCKET_ADDRESS)
+        finally:
+            time.time = wall_clock
+        self.assertTrue(again is socket)
+        pool.release(again)
+        pool.close()
+
+    def test_socket_discarded_on_error(self):
+        try:
+            with self.pool.connection(REQ, SOCKET_ADDRESS) as socket:
+                raise ValueError()
+        except ValueError:
+            pass
+        self.assertFalse(socket.is_open())
+        self.assertEqual(0, len(self.pool))
+
+
+if __name__ == '__main__':
+    unittest.main()
@@ -11,6 +11,7 @@ from nanomsg import (
     SUB_SUBSCRIBE,
     Socket
 )
+from nanomsg.subscription import ConflatingSubscriber, SubscriptionDispatcher
 
 SOCKET_ADDRESS = os.environ.get('NANOMSG_PY_TEST_ADDRESS', "inproc://a")
 
@@ -32,5 +33,61 @@ class TestPubSubSockets(unittest.TestCase):
 
                 self.assertEquals(expected, actual)
 
+
+class TestSubscriptionDispatcher(unittest.TestCase):
+    def test_dispatch(self):
+        recieved = []
+        with Socket(PUB) as pub:
+            with SubscriptionDispatcher() as dispatcher:
+                pub.bind(SOCKET_ADDRESS)
+                dispatcher.socket.connect(SOCKET_ADDRESS)
+                dispatcher.subscribe(b'price.', lambda m: recieved.append(
+                    ('price', m)))
+                dispatcher.subscribe(b'price.EUR', lambda m: recieved.append(
+                    ('EUR', m)))
+                pub.send(b'news.1')
+                pub.send(b'price.USD 1')
+                pub.send(b'price.EUR 2')
+                count = 0
+                while count < 2:
+                    count += dispatcher.dispatch_batch()
+        self.assertEqual([('price', b'price.USD 1'), ('price', b'price.EUR 2'),
+                          ('EUR', b'price.EUR 2')], recieved)
+
+    def test_longest_prefix(self):
+        dispatcher = SubscriptionDispatcher(mode='longest')
+        with dispatcher:
+            dispatcher.subscribe(b'a', 'short')
+            dispatcher.subscribe(b'abc', 'long')
+            self.assertEqual(['long'], dispatcher.handlers(b'abcd'))
+            self.assertEqual(['short'], dispatcher.handlers(b'ab'))
+            self.assertEqual([], dispatcher.handlers(b'b'))
+            dispatcher.unsubscribe(b'abc')
+            self.assertEqual(['short'], dispatcher.handlers(b'abcd'))
+            self.assertEqual([b'a'], dispatcher.topics)
+
+
+class TestConflatingSubscriber(unittest.TestCase):
+    def test_newest_message_per_topic(self):
+        latest = {}
+        returned = 0
+        with Socket(PUB) as pub:
+            with ConflatingSubscriber(batch_size=2) as subscriber:
+                pub.bind(SOCKET_ADDRESS)
+                subscriber.socket.connect(SOCKET_ADDRESS)
+                subscriber.subscribe(b'EUR')
+                subscriber.subscribe(b'USD')
+                for i in range(5):
+                    pub.send(b'EUR %d' % (i,))
+                    pub.send(b'USD %d' % (i,))
+                while subscriber.received < 10:
+                    conflated = subscriber.poll()
+                    returned += len(conflated)
+                    latest.update(conflated)
+        self.assertEqual({b'EUR': b'EUR 4', b'USD': b'USD 4'}, latest)
+        self.assertEqual(10, subscriber.received)
+        self.assertEqual(10, returned + subscriber.dropped)
+
+
 if __name__ == '__main__':
     unittest.main()
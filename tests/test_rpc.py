@@ -0,0 +1,71 @@
+import time
+import unittest
+import os
+import uuid
+
+from nanomsg_wrappers import set_wrapper_choice, get_default_for_platform
+set_wrapper_choice(os.environ.get('NANOMSG_PY_TEST_WRAPPER',
+                                  get_default_for_platform()))
+
+from nanomsg import (
+    REQ,
+    Socket
+)
+from nanomsg.rpc import Client, RemoteError, Server
+
+SOCKET_ADDRESS = os.environ.get('NANOMSG_PY_TEST_ADDRESS',
+                                "inproc://{0}".format(uuid.uuid4()))
+
+
+def slow_upper(request):
+    if request.startswith(b'slow'):
+        time.sleep(0.2)
+    if request == b'fail':
+        raise ValueError('bad request')
+    return request.upper()
+
+
+class TestRpc(unittest.TestCase):
+    def test_call(self):
+        with Server(slow_upper) as server:
+            server.bind(SOCKET_ADDRESS)
+            server.start()
+            with Client(SOCKET_ADDRESS) as client:
+                self.assertEqual(b'HELLO', client.call(b'hello', timeout=5))
+                self.assertEqual(0, len(client))
+
+    def test_replies_out_of_order(self):
+        finished = []
+        with Server(slow_upper) as server:
+            server.bind(SOCKET_ADDRESS)
+            server.start()
+            with Client(SOCKET_ADDRESS) as client:
+                slow = client.call_async(b'slow')
+                fast = client.call_async(b'fast')
+                slow.add_done_callback(lambda f: finished.append('slow'))
+                fast.add_done_callback(lambda f: finished.append('fast'))
+                self.assertEqual(b'FAST', fast.result(5))
+                self.assertEqual(b'SLOW', slow.result(5))
+        self.assertEqual(['fast', 'slow'], finished)
+
+    def test_remote_error(self):
+        with Server(slow_upper) as server:
+            server.bind(SOCKET_ADDRESS)
+            server.start()
+            with Client(SOCKET_ADDRESS) as client:
+                with self.assertRaises(RemoteError) as context:
+                    client.call(b'fail', timeout=5)
+        self.assertIn('bad request', str(context.exception))
+
+    def test_plain_req_socket(self):
+        with Server(slow_upper) as server:
+            server.bind(SOCKET_ADDRESS)
+            server.start()
+            with Socket(REQ) as req:
+                req.connect(SOCKET_ADDRESS)
+                req.send(b'hello')
+                self.assertEqual(b'\x00HELLO', req.recv())
+
+
+if __name__ == '__main__':
+    unittest.main()
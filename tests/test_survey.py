@@ -0,0 +1,66 @@
+import threading
+import time
+import unittest
+import os
+import uuid
+
+from nanomsg_wrappers import set_wrapper_choice, get_default_for_platform
+set_wrapper_choice(os.environ.get('NANOMSG_PY_TEST_WRAPPER',
+                                  get_default_for_platform()))
+
+from nanomsg import (
+    RESPONDENT,
+    NanoMsgAPIError,
+    Socket
+)
+from nanomsg.survey import Surveyor
+
+SOCKET_ADDRESS = os.environ.get('NANOMSG_PY_TEST_ADDRESS',
+                                "inproc://{0}".format(uuid.uuid4()))
+
+
+def respond(socket, reply):
+    socket.recv_timeout = 2000
+    try:
+        socket.recv()
+        socket.send(reply)
+    except NanoMsgAPIError:
+        pass
+
+
+class TestSurveyor(unittest.TestCase):
+    def survey(self, replies, **kwargs):
+        with Surveyor() as surveyor:
+            surveyor.bind(SOCKET_ADDRESS)
+            respondents = [Socket(RESPONDENT) for _ in replies]
+            try:
+                for respondent in respondents:
+                    respondent.connect(SOCKET_ADDRESS)
+                threads = [threading.Thread(target=respond, args=args)
+                           for args in zip(respondents, replies)]
+                for thread in threads:
+                    thread.start()
+                start = time.time()
+                responses = surveyor.survey(b'ping', **kwargs)
+                elapsed = time.time() - start
+                for thread in threads:
+                    thread.join()
+            finally:
+                for respondent in respondents:
+                    respondent.close()
+        return responses, elapsed
+
+    def test_survey_until_deadline(self):
+        responses, elapsed = self.survey([b'a', b'b', b'c'], deadline=0.5)
+        self.assertEqual([b'a', b'b', b'c'], sorted(responses))
+        self.assertTrue(elapsed >= 0.4)
+
+    def test_survey_returns_on_quorum(self):
+        responses, elapsed = self.survey([b'a', b'b'], deadline=5,
+                                         min_responses=2)
+        self.assertEqual([b'a', b'b'], sorted(responses))
+        self.assertTrue(elapsed < 4)
+
+
+if __name__ == '__main__':
+    unittest.main()